@@ -0,0 +1,25 @@
+import asyncio
+from datetime import date
+from fastapi import APIRouter, Depends
+from core.security import require
+from db.tenancy import current_clinic, tenant_db
+from api.appointments import appointments
+
+router = APIRouter()
+
+# Routes each call to the database of the requesting clinic
+db = tenant_db
+
+def build_report(clinic: str, appointment_rows: list) -> dict:
+    # numpy is only loaded once someone asks for analytics, keeping it out of cold start
+    from core.analytics import no_show_report, patient_snapshot
+    snapshot = patient_snapshot(clinic)
+    snapshot.refresh(db)
+    return {**snapshot.report(date.today()), "no_shows": no_show_report(appointment_rows)}
+
+@router.get("/")
+async def population_analytics(current=Depends(require("user_mgmt", "Edit"))):
+    """
+    Age, gender, visit recency and no-show figures for the clinic.
+    """
+    return await asyncio.to_thread(build_report, current_clinic.get(), list(appointments))
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, Request, HTTPException
+import json
+from fastapi import APIRouter, Request, Response, HTTPException
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from collections import Counter
+from datetime import date
+from typing import Dict, List, Literal, Optional
+from core.coalesce import coalescer
+from core.config import CALENDAR_MAX_DAYS
+from core.recurrence import occurrences
+from core.events import broadcaster
+from db.tenancy import current_clinic
+from db.stats import appointment_counts
 
 router = APIRouter()
 
@@ -33,6 +42,11 @@ appointments = [
     }
 ]
 
+# Recurring series, stored once and expanded per requested window
+recurring_appointments = []
+
+appointment_counts.rebuild(appointments)
+
 # Pydantic model for edit form
 class AppointmentUpdate(BaseModel):
     date: str
@@ -40,12 +54,119 @@ class AppointmentUpdate(BaseModel):
     reason: str
     status: str  # "Scheduled", "Completed", etc.
 
+# Pydantic model for a recurring series (RRULE-style)
+class RecurringAppointmentCreate(BaseModel):
+    patient_name: str
+    start_date: date
+    time: str
+    reason: str
+    frequency: Literal["DAILY", "WEEKLY", "MONTHLY"]
+    interval: int = Field(1, ge=1)
+    until: Optional[date] = None
+    count: Optional[int] = Field(None, ge=1)
+    exdates: List[date] = []
+
+class OccurrenceSkip(BaseModel):
+    date: date
+
+def _series_occurrences(series: dict, window_start: date, window_end: date):
+    for day in occurrences(
+        date.fromisoformat(series["start_date"]),
+        series["frequency"],
+        window_start,
+        window_end,
+        interval=series["interval"],
+        until=date.fromisoformat(series["until"]) if series["until"] else None,
+        count=series["count"],
+        exdates={date.fromisoformat(value) for value in series["exdates"]},
+    ):
+        yield {
+            "id": f"{series['id']}:{day.isoformat()}",
+            "series_id": series["id"],
+            "patient_name": series["patient_name"],
+            "date": day.isoformat(),
+            "time": series["time"],
+            "reason": series["reason"],
+            "status": "Scheduled",
+        }
+
+def counts_for_day(day: date) -> Dict[str, int]:
+    """
+    Appointments per status on one day, recurring occurrences included,
+    so the dashboard agrees with the calendar.
+    """
+    counts = Counter(appointment_counts.for_day(day.isoformat()))
+    for series in recurring_appointments:
+        counts.update(occurrence["status"] for occurrence in _series_occurrences(series, day, day))
+    return dict(counts)
+
 @router.get("/")
 async def get_appointments():
     """
     Get all appointments.
     """
-    return JSONResponse(content={"appointments": appointments})
+    snapshot = list(appointments)
+    body = await coalescer.run("appointments", None, lambda: json.dumps({"appointments": snapshot}).encode("utf-8"))
+    return Response(body, media_type="application/json")
+
+
+@router.get("/calendar")
+async def get_calendar(start: date, end: date):
+    """
+    Get one-off appointments and expanded recurring occurrences between two dates (inclusive).
+    """
+    if end < start or (end - start).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window must be 1 to {CALENDAR_MAX_DAYS} days")
+    window = [
+        appt for appt in appointments
+        if start.isoformat() <= appt["date"] <= end.isoformat()
+    ]
+    for series in recurring_appointments:
+        window.extend(_series_occurrences(series, start, end))
+    window.sort(key=lambda appt: (appt["date"], appt["time"]))
+    return JSONResponse(content={"appointments": window})
+
+
+@router.post("/recurring")
+async def create_recurring_appointment(rule: RecurringAppointmentCreate):
+    """
+    Create a recurring series. Occurrences are never stored individually.
+    """
+    if rule.until is not None and rule.count is not None:
+        raise HTTPException(status_code=400, detail="Use either until or count, not both")
+    if rule.until is not None and rule.until < rule.start_date:
+        raise HTTPException(status_code=400, detail="until must not be before start_date")
+    series = {
+        "id": max((s["id"] for s in recurring_appointments), default=0) + 1,
+        "patient_name": rule.patient_name,
+        "start_date": rule.start_date.isoformat(),
+        "time": rule.time,
+        "reason": rule.reason,
+        "frequency": rule.frequency,
+        "interval": rule.interval,
+        "until": rule.until.isoformat() if rule.until else None,
+        "count": rule.count,
+        "exdates": sorted(value.isoformat() for value in rule.exdates),
+    }
+    recurring_appointments.append(series)
+    coalescer.invalidate("dashboard")
+    broadcaster.publish("appointment_series.created", dict(series), clinic=current_clinic.get())
+    return {"series": series}
+
+
+@router.post("/recurring/{series_id}/skip")
+async def skip_occurrence(series_id: int, skip: OccurrenceSkip):
+    """
+    Cancel a single occurrence of a recurring series.
+    """
+    for series in recurring_appointments:
+        if series["id"] == series_id:
+            if skip.date.isoformat() not in series["exdates"]:
+                series["exdates"] = sorted(series["exdates"] + [skip.date.isoformat()])
+                coalescer.invalidate("dashboard")
+            broadcaster.publish("appointment_series.updated", dict(series), clinic=current_clinic.get())
+            return {"series": series}
+    raise HTTPException(status_code=404, detail="Series not found")
 
 
 @router.post("/new")
@@ -63,6 +184,10 @@ async def create_appointment(appt: AppointmentUpdate):
         "status": appt.status
     }
     appointments.append(new_appt)
+    appointment_counts.add(new_appt)
+    coalescer.invalidate("appointments")
+    coalescer.invalidate("dashboard")
+    broadcaster.publish("appointment.created", dict(new_appt), clinic=current_clinic.get())
     return {"appointment": new_appt}
 
 
@@ -84,10 +209,15 @@ async def update_appointment(appointment_id: int, updated: AppointmentUpdate):
     """
     for appt in appointments:
         if appt["id"] == appointment_id:
+            appointment_counts.remove(appt)
             appt["date"] = updated.date
             appt["time"] = updated.time
             appt["reason"] = updated.reason
             appt["status"] = updated.status
+            appointment_counts.add(appt)
+            coalescer.invalidate("appointments")
+            coalescer.invalidate("dashboard")
+            broadcaster.publish("appointment.updated", dict(appt), clinic=current_clinic.get())
             return JSONResponse(content=appt)
 
     raise HTTPException(status_code=404, detail="Appointment not found")
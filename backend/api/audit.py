@@ -0,0 +1,23 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from core.audit import audit_log
+from core.security import require
+
+router = APIRouter()
+
+@router.get("/")
+async def list_audit_events(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    username: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    limit: int = 100,
+    current=Depends(require("user_mgmt", "Edit")),
+):
+    """
+    Query the clinic's audit log by time range (ISO timestamps), user or patient.
+    """
+    if not 1 <= limit <= 1000:
+        raise HTTPException(400, "limit must be between 1 and 1000")
+    events = await audit_log.query(start=start, end=end, username=username, patient_id=patient_id, limit=limit)
+    return {"events": events}
@@ -1,24 +1,31 @@
 from fastapi import APIRouter, Form, Request, Response, HTTPException
-from core.config import COOKIE_NAME
-from db.database import SQLiteDatabase
+from core.config import CLINIC_COOKIE_NAME, COOKIE_NAME, DEFAULT_CLINIC
+from db.tenancy import is_valid_clinic, tenant_db
 
 router = APIRouter()
 
-# Initialize the database
-db = SQLiteDatabase()
+# Routes each call to the database of the requesting clinic
+db = tenant_db
 
 @router.post("/login")
-async def login(response: Response, username: str = Form(...), password: str = Form(...), remember: bool = Form(False)):
-    user = db.get_user(username)
+async def login(response: Response, username: str = Form(...), password: str = Form(...), remember: bool = Form(False), clinic: str = Form(DEFAULT_CLINIC)):
+    if clinic != DEFAULT_CLINIC and not is_valid_clinic(clinic):
+        raise HTTPException(400, "Invalid clinic")
+    if not db.has_clinic(clinic):
+        raise HTTPException(404, "Unknown clinic")
+    # Users live in their clinic's database, not the one from any previous session
+    user = db.for_clinic(clinic).get_user(username)
     if not user or password != user["password"]:
         raise HTTPException(401, "Invalid credentials")
     max_age = 2592000 if remember else 3600
     response.set_cookie(COOKIE_NAME, username, max_age=max_age, httponly=True, samesite="none", secure=True)
+    response.set_cookie(CLINIC_COOKIE_NAME, clinic, max_age=max_age, httponly=True, samesite="none", secure=True)
     return {"message": "Login successful"}
 
 @router.post("/logout")
 async def logout(response: Response):
     response.delete_cookie(COOKIE_NAME, samesite="none", secure=True)
+    response.delete_cookie(CLINIC_COOKIE_NAME, samesite="none", secure=True)
     return {"message": "Logged out"}
 
 @router.get("/me")
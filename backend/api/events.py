@@ -0,0 +1,31 @@
+import json
+from typing import Optional
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import StreamingResponse
+from core.events import broadcaster
+from core.security import get_current_user
+from db.tenancy import current_clinic
+
+router = APIRouter()
+
+# Keep idle connections open through proxies
+HEARTBEAT_SECONDS = 15
+
+def format_event(event: dict) -> str:
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+@router.get("/events")
+async def events(request: Request, last_event_id: Optional[int] = Header(None)):
+    """
+    Stream patient and appointment changes as server-sent events.
+    """
+    get_current_user(request)
+
+    async def stream():
+        async for event in broadcaster.subscribe(last_event_id, heartbeat=HEARTBEAT_SECONDS, clinic=current_clinic.get()):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield format_event(event)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from core.coalesce import coalescer
+from core.startup import warm_up
+
+router = APIRouter()
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once warm-up has finished, 503 until then.
+    """
+    status = warm_up.status()
+    return JSONResponse(status, status_code=200 if warm_up.ready else 503)
+
+@router.get("/live")
+async def live():
+    return {"status": "alive"}
+
+@router.get("/metrics")
+async def metrics():
+    return {"coalescing": coalescer.stats}
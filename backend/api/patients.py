@@ -1,38 +1,139 @@
-from fastapi import APIRouter, Request, HTTPException
-from db.database import SQLiteDatabase
-from core.security import get_current_user
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Request, Response, HTTPException
+from core.config import DUPLICATE_MIN_SCORE, PATIENT_BATCH_LIMIT, PATIENT_CHANGES_LIMIT, PATIENT_FIELDS
+from db.tenancy import tenant_db
+from core.security import require
+from core.audit import audit_log
+from core.coalesce import coalescer
+from core.events import broadcaster
+from core.responses import FastJSONResponse
+from db.tenancy import current_clinic
+from db.rows import dumps
 
 router = APIRouter()
 
-# Initialize the database
-db = SQLiteDatabase()
+# Routes each call to the database of the requesting clinic
+db = tenant_db
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a comma separated `fields=` query parameter against the patient whitelist.
+    """
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    for field in selected:
+        if field not in PATIENT_FIELDS:
+            raise HTTPException(400, f"Invalid field: {field}")
+    # Whitelist order without repeats, so equivalent selections share coalescing and cache keys
+    return [field for field in PATIENT_FIELDS if field in selected]
 
 @router.get("/")
-async def get_patients(request: Request):
-    get_current_user(request)
-    summary = db.list_patients_summary()
-    return {"patients": summary}
+async def get_patients(fields: Optional[str] = None, current=Depends(require("patient_mgmt", "View"))):
+    selected = parse_fields(fields)
+    # Clients opening at the same moment share one query and one encoded body
+    body = await coalescer.run(
+        "patients",
+        (current_clinic.get(), tuple(selected or ())),
+        lambda: dumps({"patients": db.list_patients_summary(fields=selected)}),
+    )
+    return Response(body, media_type="application/json")
+
+def parse_ids(ids: str) -> List[int]:
+    """
+    Parse a comma separated `ids=` query parameter, dropping duplicates.
+    """
+    try:
+        selected = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(400, "ids must be comma separated integers")
+    if not selected:
+        raise HTTPException(400, "ids is required")
+    if len(selected) > PATIENT_BATCH_LIMIT:
+        raise HTTPException(400, f"At most {PATIENT_BATCH_LIMIT} ids per request")
+    return selected
+
+@router.get("/batch")
+async def get_patients_batch(ids: str, fields: Optional[str] = None, current=Depends(require("patient_mgmt", "View"))):
+    """
+    Fetch several patients in one round trip, keyed by id, with the ids that were not found.
+    """
+    patient_ids = parse_ids(ids)
+    patients = db.get_patients(patient_ids, fields=parse_fields(fields))
+    for patient_id in patients:
+        await audit_log.record("patient.view", current["username"], patient_id=patient_id)
+    return FastJSONResponse({
+        "patients": {str(patient_id): patient for patient_id, patient in patients.items()},
+        "missing": [patient_id for patient_id in patient_ids if patient_id not in patients],
+    })
+
+@router.get("/changes")
+async def get_patient_changes(since: int = 0, limit: int = PATIENT_CHANGES_LIMIT, current=Depends(require("patient_mgmt", "View"))):
+    """
+    Patients changed or deleted since the client's cursor. Pass the returned
+    `cursor` as `since` on the next call; keep calling while `has_more` is true.
+    """
+    if since < 0 or not 1 <= limit <= PATIENT_CHANGES_LIMIT:
+        raise HTTPException(400, f"since must be >= 0 and limit between 1 and {PATIENT_CHANGES_LIMIT}")
+    changes = db.list_patient_changes(since, limit)
+    await audit_log.record("patient.sync", current["username"], target=f"since={since}")
+    return FastJSONResponse(changes)
+
+@router.post("/duplicates/check")
+async def check_duplicates(request: Request, current=Depends(require("patient_mgmt", "View"))):
+    """
+    Likely existing charts for a patient about to be registered, matched on
+    a phonetic name code plus date of birth and scored by name similarity.
+    """
+    data = await request.json()
+    if not data.get("name") or not data.get("date_of_birth"):
+        raise HTTPException(400, "name and date_of_birth are required")
+    candidates = db.find_duplicate_candidates(data["name"], data["date_of_birth"], exclude_id=data.get("exclude_id"))
+    for candidate in candidates:
+        await audit_log.record("patient.view", current["username"], patient_id=candidate["patient"]["id"])
+    return FastJSONResponse({"candidates": candidates})
+
+@router.get("/duplicates")
+async def get_duplicate_pairs(min_score: float = DUPLICATE_MIN_SCORE, current=Depends(require("patient_mgmt", "Edit"))):
+    """
+    Scan the clinic for charts that are likely the same person, for merging.
+    """
+    if not 0 < min_score <= 1:
+        raise HTTPException(400, "min_score must be between 0 and 1")
+    pairs = db.find_duplicate_pairs(min_score)
+    await audit_log.record("patient.duplicates", current["username"], target=f"pairs={len(pairs)}")
+    return FastJSONResponse({"pairs": pairs})
 
 @router.get("/{patient_id}")
-async def get_patient_detail(patient_id: int, request: Request):
-    get_current_user(request)
-    patient = db.get_patient(patient_id)
+async def get_patient_detail(patient_id: int, fields: Optional[str] = None, current=Depends(require("patient_mgmt", "View"))):
+    patient = db.get_patient(patient_id, fields=parse_fields(fields))
     if not patient:
         raise HTTPException(404, "Patient not found")
-    return patient
+    await audit_log.record("patient.view", current["username"], patient_id=patient_id)
+    return FastJSONResponse(patient)
 
 @router.post("/new")
-async def create_patient(request: Request):
-    get_current_user(request)
+async def create_patient(request: Request, current=Depends(require("patient_mgmt", "Edit"))):
     data = await request.json()
     new_patient = db.create_patient(data)
+    coalescer.invalidate("patients")
+    coalescer.invalidate("dashboard")
+    await audit_log.record("patient.create", current["username"], patient_id=new_patient["id"])
+    broadcaster.publish("patient.created", {"id": new_patient["id"]}, clinic=current_clinic.get())
+    # Registration is never blocked; the client offers a merge when matches come back
+    duplicates = db.find_duplicate_candidates(new_patient["name"], new_patient["date_of_birth"], exclude_id=new_patient["id"])
+    if duplicates:
+        return FastJSONResponse({**new_patient, "possible_duplicates": duplicates})
     return new_patient
 
 @router.post("/{patient_id}")
-async def update_patient(patient_id: int, request: Request):
-    get_current_user(request)
+async def update_patient(patient_id: int, request: Request, current=Depends(require("patient_mgmt", "Edit"))):
     data = await request.json()
     updated_patient = db.update_patient(patient_id, data)
     if not updated_patient:
         raise HTTPException(404, "Patient not found")
-    return updated_patient
\ No newline at end of file
+    coalescer.invalidate("patients")
+    coalescer.invalidate("dashboard")
+    await audit_log.record("patient.update", current["username"], patient_id=patient_id)
+    broadcaster.publish("patient.updated", {"id": patient_id}, clinic=current_clinic.get())
+    return FastJSONResponse(updated_patient)
@@ -1,23 +1,20 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException
 from core.config import MODULES, PERMISSION_LEVELS
-from core.security import get_current_user
-from db.database import SQLiteDatabase
+from core.audit import audit_log
+from core.security import require
+from db.tenancy import tenant_db
 
 router = APIRouter()
 
-# Initialize the database
-db = SQLiteDatabase()
+# Routes each call to the database of the requesting clinic
+db = tenant_db
 
 @router.get("/options")
 async def permissions_options():
     return {"modules": MODULES, "levels": PERMISSION_LEVELS}
 
 @router.post("/{target_username}/permissions")
-async def update_permissions(target_username: str, request: Request):
-    current = get_current_user(request)
-    if current["username"] != "admin":
-        raise HTTPException(403, "Admin access required")
-    
+async def update_permissions(target_username: str, request: Request, current=Depends(require("user_mgmt", "Edit"))):
     target_user = db.get_user(target_username)
     if not target_user:
         raise HTTPException(404, "User not found")
@@ -30,5 +27,6 @@ async def update_permissions(target_username: str, request: Request):
     success = db.update_user_permissions(target_username, data)
     if not success:
         raise HTTPException(500, "Failed to update permissions")
+    await audit_log.record("permissions.update", current["username"], target=target_username)
     
     return {"username": target_username, "permissions": data}
\ No newline at end of file
@@ -1,17 +1,13 @@
-from fastapi import APIRouter, Request, HTTPException
-from core.security import get_current_user
-from db.database import SQLiteDatabase
+from fastapi import APIRouter, Depends
+from core.security import require
+from db.tenancy import tenant_db
 
 router = APIRouter()
 
-# Initialize the database
-db = SQLiteDatabase()
+# Routes each call to the database of the requesting clinic
+db = tenant_db
 
 @router.get("/")
-async def list_users(request: Request):
-    current = get_current_user(request)
-    if current["username"] != "admin":
-        raise HTTPException(403, "Admin access required")
-    
+async def list_users(current=Depends(require("user_mgmt", "Edit"))):
     users = db.list_users()
     return {"users": [{"username": user["username"], "permissions": user["permissions"]} for user in users]}
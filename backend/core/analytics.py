@@ -0,0 +1,143 @@
+import threading
+from datetime import date
+from typing import Dict, Iterable, List
+import numpy as np
+from core.config import PATIENT_CHANGES_LIMIT
+
+# Population reports over a columnar copy of the patients table. The copy is
+# kept per clinic and brought up to date from the change feed
+# (list_patient_changes), so a report only reads what changed since the last
+# one and every figure is computed with array operations, not Python loops.
+
+AGE_BINS = [0, 18, 30, 45, 65, 80]
+AGE_LABELS = ["0-17", "18-29", "30-44", "45-64", "65-79", "80+"]
+RECENCY_BINS = [0, 30, 90, 180, 365, 730]
+RECENCY_LABELS = ["<30d", "30-89d", "90-179d", "180-364d", "1-2y", "2y+"]
+# Appointments whose outcome is known; "Missed" counts as a no-show
+OUTCOME_STATUSES = ("Completed", "Missed")
+
+
+def to_days(values: Iterable[str]) -> np.ndarray:
+    """
+    ISO dates to datetime64[D]; anything unparsable becomes NaT.
+    """
+    days = []
+    for value in values:
+        try:
+            days.append(np.datetime64(str(value)[:10], "D"))
+        except ValueError:
+            days.append(np.datetime64("NaT"))
+    return np.array(days, dtype="datetime64[D]")
+
+
+def bucket_counts(values: np.ndarray, bins: List[int], labels: List[str]) -> Dict[str, int]:
+    counts = np.bincount(np.digitize(values, bins[1:]), minlength=len(labels))
+    return dict(zip(labels, counts.tolist()))
+
+
+class PatientSnapshot:
+    """
+    Column arrays of one clinic's patients, indexed by row position.
+    """
+
+    def __init__(self):
+        self.cursor = 0
+        self.positions: Dict[int, int] = {}
+        self.born = np.empty(0, dtype="datetime64[D]")
+        self.last_visit = np.empty(0, dtype="datetime64[D]")
+        self.gender = np.empty(0, dtype=np.int32)
+        self.live = np.empty(0, dtype=bool)
+        self.genders: List[str] = []
+        self._lock = threading.Lock()
+
+    def _gender_code(self, gender: str) -> int:
+        if gender not in self.genders:
+            self.genders.append(gender)
+        return self.genders.index(gender)
+
+    def refresh(self, database):
+        """
+        Apply every patient change after the snapshot's cursor.
+        """
+        with self._lock:
+            while True:
+                changes = database.list_patient_changes(self.cursor, PATIENT_CHANGES_LIMIT)
+                self._apply(changes["patients"], changes["deleted"])
+                self.cursor = changes["cursor"]
+                if not changes["has_more"]:
+                    break
+
+    def _apply(self, patients: List, deleted: List[int]):
+        if patients:
+            born = to_days(patient["date_of_birth"] for patient in patients)
+            last_visit = to_days(patient["last_visit"] for patient in patients)
+            gender = np.array([self._gender_code(patient["gender"]) for patient in patients], dtype=np.int32)
+            existing = np.array([patient["id"] in self.positions for patient in patients], dtype=bool)
+            # Changed rows are overwritten in place
+            if existing.any():
+                rows = np.array([self.positions[patient["id"]] for patient in patients if patient["id"] in self.positions])
+                self.born[rows] = born[existing]
+                self.last_visit[rows] = last_visit[existing]
+                self.gender[rows] = gender[existing]
+                self.live[rows] = True
+            # New rows are appended with one copy per batch
+            added = ~existing
+            if added.any():
+                start = len(self.live)
+                for offset, patient in enumerate(patient for patient, is_new in zip(patients, added) if is_new):
+                    self.positions[patient["id"]] = start + offset
+                self.born = np.concatenate([self.born, born[added]])
+                self.last_visit = np.concatenate([self.last_visit, last_visit[added]])
+                self.gender = np.concatenate([self.gender, gender[added]])
+                self.live = np.concatenate([self.live, np.ones(int(added.sum()), dtype=bool)])
+        for patient_id in deleted:
+            position = self.positions.get(patient_id)
+            if position is not None:
+                self.live[position] = False
+
+    def report(self, today: date) -> Dict:
+        with self._lock:
+            now = np.datetime64(today.isoformat(), "D")
+            live = self.live
+            born = self.born[live & ~np.isnat(self.born)]
+            ages = ((now - born).astype(np.int64) / 365.2425).astype(np.int64)
+            visits = self.last_visit[live & ~np.isnat(self.last_visit)]
+            since_visit = np.maximum((now - visits).astype(np.int64), 0)
+            gender_counts = np.bincount(self.gender[live], minlength=len(self.genders))
+            return {
+                "patients": int(live.sum()),
+                "age": bucket_counts(np.maximum(ages, 0), AGE_BINS, AGE_LABELS),
+                "gender": {gender: int(count) for gender, count in zip(self.genders, gender_counts) if count},
+                "visit_recency": bucket_counts(since_visit, RECENCY_BINS, RECENCY_LABELS),
+            }
+
+
+def no_show_report(appointments: List[Dict]) -> Dict:
+    """
+    Share of appointments with a known outcome that were missed, overall and per month.
+    """
+    statuses = np.array([appt["status"] for appt in appointments], dtype=object)
+    months = np.array([appt["date"][:7] for appt in appointments], dtype=object)
+    decided = np.isin(statuses, OUTCOME_STATUSES)
+    missed = statuses[decided] == "Missed"
+    labels, month_index = np.unique(months[decided], return_inverse=True)
+    totals = np.bincount(month_index, minlength=len(labels))
+    misses = np.bincount(month_index, weights=missed, minlength=len(labels))
+    return {
+        "appointments": int(decided.sum()),
+        "missed": int(missed.sum()),
+        "rate": round(float(missed.mean()), 4) if missed.size else None,
+        "by_month": {
+            str(label): {"appointments": int(total), "missed": int(miss), "rate": round(float(miss / total), 4)}
+            for label, total, miss in zip(labels, totals, misses)
+        },
+    }
+
+
+_snapshots: Dict[str, PatientSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def patient_snapshot(clinic: str) -> PatientSnapshot:
+    with _snapshots_lock:
+        return _snapshots.setdefault(clinic, PatientSnapshot())
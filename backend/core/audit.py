@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from core.config import AUDIT_BATCH_SIZE, AUDIT_DB_PATH, AUDIT_FLUSH_SECONDS, AUDIT_MAX_BUFFER
+from db.audit import AUDIT_MIGRATIONS, query_events, write_events
+from db.migrations import apply_migrations
+from db.tenancy import current_clinic
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """
+    Buffers patient-record access events in memory and writes them in batches.
+
+    A background task flushes every `flush_seconds`, or sooner once
+    `batch_size` events are waiting. When `max_buffer` events are pending,
+    `record` waits for the buffer to drain before returning, so a slow disk
+    slows requests down instead of dropping audit events. If the audit
+    database cannot be written at all, the buffer stays capped at
+    `max_buffer` by dropping the oldest events, which are logged and
+    counted in `dropped`; requests never fail because of the audit log.
+    """
+
+    def __init__(
+        self,
+        db_path: str = AUDIT_DB_PATH,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+        max_buffer: int = AUDIT_MAX_BUFFER,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_buffer = max_buffer
+        self._buffer: List[Dict] = []
+        self.dropped = 0
+        self._schema_ready = False
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def record(self, action: str, username: str, patient_id: Optional[int] = None, target: Optional[str] = None):
+        self._buffer.append({
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "clinic": current_clinic.get(),
+            "username": username,
+            "action": action,
+            "patient_id": patient_id,
+            "target": target,
+        })
+        if len(self._buffer) >= self.max_buffer:
+            await self._drain()
+        elif len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def prepare(self):
+        """
+        Create or upgrade the audit database; a no-op once it has run.
+        """
+        if not self._schema_ready:
+            apply_migrations(self.db_path, AUDIT_MIGRATIONS)
+            self._schema_ready = True
+
+    def _write(self, batch: List[Dict]):
+        self.prepare()
+        write_events(self.db_path, batch)
+
+    async def flush(self):
+        async with self._flush_lock:
+            await self._write_buffer()
+
+    async def _drain(self):
+        """
+        Wait until the buffer is below `max_buffer`, writing it unless a
+        flush that finished meanwhile already did.
+        """
+        async with self._flush_lock:
+            if len(self._buffer) < self.max_buffer:
+                return
+            try:
+                await self._write_buffer()
+            except Exception:
+                logger.exception("Failed to flush %d audit events", len(self._buffer))
+
+    async def _write_buffer(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception:
+            # Keep the events for the next attempt, oldest first
+            self._buffer[:0] = batch
+            self._drop_overflow()
+            raise
+
+    def _drop_overflow(self):
+        overflow = len(self._buffer) - self.max_buffer
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self.dropped += overflow
+            logger.error("Audit buffer full; dropped the %d oldest events (%d so far)", overflow, self.dropped)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush %d audit events", len(self._buffer))
+
+    def start(self):
+        if self._task is None:
+            # Bind the wakeup event to the running loop
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the background task and write everything still buffered.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def query(self, **filters) -> List[Dict]:
+        # Make recent events visible to the query before reading
+        await self.flush()
+        if not self._schema_ready:
+            await asyncio.to_thread(self.prepare)
+        return await asyncio.to_thread(query_events, self.db_path, current_clinic.get(), **filters)
+
+
+audit_log = AuditLog()
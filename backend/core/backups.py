@@ -0,0 +1,33 @@
+import asyncio
+import logging
+from core.config import BACKUP_COMPRESS, BACKUP_DIR
+from db.backup import acquire_backup_lock, backup_clinics
+from db.tenancy import shards
+
+logger = logging.getLogger(__name__)
+
+
+async def run_scheduled_backups(interval: float):
+    """
+    Snapshot every clinic database every `interval` seconds, off the event loop.
+
+    Every worker runs this task, but only the one holding the scheduler lock
+    takes snapshots; the others keep trying so one of them takes over if
+    that worker exits.
+    """
+    lock = None
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            if lock is None:
+                lock = acquire_backup_lock(BACKUP_DIR)
+                if lock is None:
+                    continue
+            try:
+                paths = await asyncio.to_thread(backup_clinics, shards, BACKUP_DIR, BACKUP_COMPRESS)
+                logger.info("Scheduled backup wrote %d snapshots", len(paths))
+            except Exception:
+                logger.exception("Scheduled backup failed")
+    finally:
+        if lock is not None:
+            lock.close()
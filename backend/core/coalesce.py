@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+from core.config import COALESCE_TTL_SECONDS
+
+
+class SingleFlight:
+    """
+    Lets concurrent identical reads share one load.
+
+    The first caller for a key starts `load` in a worker thread; callers that
+    arrive while it runs await the same result instead of repeating the
+    query and serialization. With a `ttl` the finished result is also
+    reused for that many seconds. `invalidate(namespace)` is called from
+    the write path so no caller is handed a result that predates a write
+    it could have seen.
+    """
+
+    def __init__(self, ttl: float = COALESCE_TTL_SECONDS):
+        self.ttl = ttl
+        self._flights: Dict[Tuple, asyncio.Future] = {}
+        self._recent: Dict[Tuple, Tuple[float, Any]] = {}
+        self._generations: Dict[str, int] = {}
+        self.stats = {"loads": 0, "coalesced": 0, "cached": 0}
+
+    async def run(self, namespace: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        flight_key = (namespace, self._generations.get(namespace, 0), key)
+        recent = self._recent.get(flight_key)
+        if recent is not None and recent[0] > time.monotonic():
+            self.stats["cached"] += 1
+            return recent[1]
+        flight = self._flights.get(flight_key)
+        if flight is None:
+            self.stats["loads"] += 1
+            flight = asyncio.ensure_future(asyncio.to_thread(load))
+            self._flights[flight_key] = flight
+            flight.add_done_callback(lambda done: self._finish(flight_key, done))
+        else:
+            self.stats["coalesced"] += 1
+        # A caller that disconnects must not cancel the load for the others
+        return await asyncio.shield(flight)
+
+    def _finish(self, flight_key: Tuple, flight: asyncio.Future):
+        self._flights.pop(flight_key, None)
+        now = time.monotonic()
+        for key in [key for key, (expires, _value) in self._recent.items() if expires <= now]:
+            del self._recent[key]
+        namespace, generation, _key = flight_key
+        if self.ttl <= 0 or flight.cancelled() or flight.exception() is not None:
+            return
+        if generation == self._generations.get(namespace, 0):
+            self._recent[flight_key] = (now + self.ttl, flight.result())
+
+    def invalidate(self, namespace: str):
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for key in [key for key in self._recent if key[0] == namespace]:
+            del self._recent[key]
+
+
+coalescer = SingleFlight()
@@ -1,3 +1,28 @@
 COOKIE_NAME = "auth_token"
-MODULES = ["patient_mgmt", "user_mgmt", "pharmacy"]
+MODULES = ["patient_mgmt", "user_mgmt", "appointments"]  # ids of the rows in the modules table
 PERMISSION_LEVELS = ["None", "View", "Edit"]
+PATIENT_FIELDS = ["id", "name", "date_of_birth", "gender", "last_visit", "contact", "emergency_contact", "insurance", "medical_history", "notes"]
+PATIENT_SUMMARY_FIELDS = ["id", "name", "date_of_birth", "gender", "last_visit"]
+DATABASE_PATH = "./db/clinikit.db"
+OVERDUE_VISIT_DAYS = 365
+CLINIC_COOKIE_NAME = "clinic"
+DEFAULT_CLINIC = "default"
+CLINIC_DB_DIR = "./db/clinics"
+MAX_OPEN_SHARDS = 32
+AUDIT_DB_PATH = "./db/audit.db"
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_SECONDS = 1.0
+AUDIT_MAX_BUFFER = 10000
+PATIENT_BATCH_LIMIT = 100
+PATIENT_CHANGES_LIMIT = 500
+CALENDAR_MAX_DAYS = 366
+BACKUP_DIR = "./db/backups"
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP = 0.05
+BACKUP_COMPRESS = True
+BACKUP_INTERVAL_SECONDS = None  # e.g. 86400 for a daily backup by whichever worker holds the scheduler lock; or cron `manage.py backup`
+COALESCE_TTL_SECONDS = 0.0  # reuse a finished response this long; 0 only shares in-flight loads
+DUPLICATE_MIN_SCORE = 0.8  # name similarity; candidates already share a date of birth
+DUPLICATE_MAX_CANDIDATES = 10
+READ_REPLICA = False  # serve users, modules and patients from an in-process copy of each shard
+READ_REPLICA_MAX_BYTES = 256 * 1024 * 1024  # per shard; patients fall back to SQLite above this
@@ -0,0 +1,84 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Dict, Optional
+
+
+class Broadcaster:
+    """
+    In-process fan-out of change events to connected clients.
+
+    Every event gets a monotonically increasing id and is kept in a bounded
+    history so a reconnecting client can resume from its Last-Event-ID.
+    Each subscriber has a bounded buffer; a client that falls behind is
+    disconnected instead of letting its queue grow without limit.
+    """
+
+    def __init__(self, history_size: int = 1000, buffer_size: int = 100):
+        self.buffer_size = buffer_size
+        self._history = deque(maxlen=history_size)
+        self._subscribers: Dict[asyncio.Queue, Optional[str]] = {}
+        self._next_id = 1
+
+    def publish(self, event_type: str, data: Dict, clinic: Optional[str] = None) -> Dict:
+        event = {"id": self._next_id, "type": event_type, "data": data, "clinic": clinic}
+        self._next_id += 1
+        self._history.append(event)
+        for queue, subscribed_clinic in list(self._subscribers.items()):
+            if not self._matches(event, subscribed_clinic):
+                continue
+            if queue.qsize() >= self.buffer_size:
+                # Slow client: end its stream, it will resume from its last event id
+                del self._subscribers[queue]
+                queue.put_nowait(None)
+            else:
+                queue.put_nowait(event)
+        return event
+
+    @staticmethod
+    def _matches(event: Dict, clinic: Optional[str]) -> bool:
+        # Clinics never see each other's changes
+        return clinic is None or event["clinic"] == clinic
+
+    def _replay(self, last_event_id: int, clinic: Optional[str]):
+        if self._history and self._history[0]["id"] > last_event_id + 1:
+            # The client missed events that are no longer buffered; the reset id moves
+            # its cursor up to the start of the history
+            yield {"id": self._history[0]["id"] - 1, "type": "reset", "data": {}, "clinic": clinic}
+        for event in self._history:
+            if event["id"] > last_event_id and self._matches(event, clinic):
+                yield event
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        heartbeat: Optional[float] = None,
+        clinic: Optional[str] = None,
+    ) -> AsyncIterator[Optional[Dict]]:
+        """
+        Yield events after `last_event_id`, or None every `heartbeat` seconds while idle.
+        """
+        queue = asyncio.Queue()
+        self._subscribers[queue] = clinic
+        try:
+            last_sent = last_event_id
+            if last_event_id is not None:
+                for event in list(self._replay(last_event_id, clinic)):
+                    last_sent = event["id"]
+                    yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                # Skip events already delivered during the replay
+                if last_sent is not None and event["id"] <= last_sent:
+                    continue
+                yield event
+        finally:
+            self._subscribers.pop(queue, None)
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,32 @@
+from typing import Dict
+from core.config import MODULES, PERMISSION_LEVELS
+
+# Every module gets one bit per level above "None": View, then Edit.
+BITS_PER_MODULE = len(PERMISSION_LEVELS) - 1
+
+
+def permission_bit(module: str, level: str) -> int:
+    """
+    The single bit that grants `level` on `module`.
+    """
+    if module not in MODULES:
+        raise ValueError(f"Unknown module: {module}")
+    rank = PERMISSION_LEVELS.index(level) if level in PERMISSION_LEVELS else 0
+    if rank == 0:
+        raise ValueError(f"Invalid permission level: {level}")
+    return 1 << (MODULES.index(module) * BITS_PER_MODULE + rank - 1)
+
+
+def compile_permissions(permissions: Dict[str, str]) -> int:
+    """
+    Fold a {module: level} dict into a bitmask. Higher levels include the
+    lower ones, so "Edit" also sets the "View" bit. Modules or levels that
+    are no longer configured grant nothing.
+    """
+    mask = 0
+    for module, level in permissions.items():
+        if module not in MODULES or level not in PERMISSION_LEVELS:
+            continue
+        for rank in range(1, PERMISSION_LEVELS.index(level) + 1):
+            mask |= permission_bit(module, PERMISSION_LEVELS[rank])
+    return mask
@@ -0,0 +1,70 @@
+import calendar
+from datetime import date, timedelta
+from typing import Collection, Iterator, Optional
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY")
+
+
+def _add_months(start: date, months: int) -> Optional[date]:
+    """
+    Same day of month `months` later, or None when that month is too short (RFC 5545 skips it).
+    """
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    if start.day > calendar.monthrange(year, month)[1]:
+        return None
+    return start.replace(year=year, month=month)
+
+
+def occurrences(
+    start: date,
+    frequency: str,
+    window_start: date,
+    window_end: date,
+    interval: int = 1,
+    until: Optional[date] = None,
+    count: Optional[int] = None,
+    exdates: Collection[date] = (),
+) -> Iterator[date]:
+    """
+    Lazily yield the dates of a recurring series that fall in [window_start, window_end].
+
+    The first candidate is computed arithmetically from the window start, so
+    the cost depends on the size of the window, not on how long ago the
+    series began. `count` caps the total number of occurrences in the series,
+    and `exdates` are skipped without shifting the ones after them.
+    """
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unsupported frequency: {frequency}")
+    if interval < 1:
+        raise ValueError("interval must be at least 1")
+    last = window_end if until is None else min(window_end, until)
+
+    if frequency in ("DAILY", "WEEKLY"):
+        step = interval * (7 if frequency == "WEEKLY" else 1)
+        index = max(0, -(-(window_start - start).days // step))
+        while count is None or index < count:
+            current = start + timedelta(days=index * step)
+            if current > last:
+                return
+            if current not in exdates:
+                yield current
+            index += 1
+        return
+
+    # MONTHLY: when short months are skipped the n-th occurrence is not the
+    # n-th month, so with a count we have to walk from the first month
+    months_before_window = (window_start.year - start.year) * 12 + window_start.month - start.month
+    skip_ahead = count is None or start.day <= 28
+    step_index = max(0, months_before_window // interval) if skip_ahead else 0
+    seen = step_index
+    while count is None or seen < count:
+        current = _add_months(start, step_index * interval)
+        step_index += 1
+        if current is None:
+            continue
+        seen += 1
+        if current > last:
+            return
+        if current >= window_start and current not in exdates:
+            yield current
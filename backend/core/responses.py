@@ -0,0 +1,17 @@
+from typing import Any
+from fastapi.responses import Response
+from db.rows import dumps
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered directly from database rows.
+
+    Returning it from a handler bypasses FastAPI's jsonable_encoder walk,
+    which matters for large patient lists.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,9 +1,10 @@
 from fastapi import Request, HTTPException
 from core.config import COOKIE_NAME
-from db.database import SQLiteDatabase
+from core.permissions import permission_bit
+from db.tenancy import tenant_db
 
-# Initialize the database
-db = SQLiteDatabase()
+# Routes each call to the database of the requesting clinic
+db = tenant_db
 
 def get_current_user(request: Request):
     username = request.cookies.get(COOKIE_NAME)
@@ -14,4 +15,19 @@ def get_current_user(request: Request):
     if not user:
         raise HTTPException(401, "Not authenticated")
     
-    return user
\ No newline at end of file
+    return user
+
+def require(module: str, level: str = "View"):
+    """
+    Dependency that returns the current user if they hold `level` on
+    `module`, e.g. `current = Depends(require("patient_mgmt", "Edit"))`.
+    """
+    bit = permission_bit(module, level)
+    
+    def check_permission(request: Request):
+        user = get_current_user(request)
+        if not user["permission_mask"] & bit:
+            raise HTTPException(403, f"{level} access to {module} required")
+        return user
+    
+    return check_permission
@@ -0,0 +1,86 @@
+import logging
+import re
+import subprocess
+import sys
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+from core.audit import audit_log
+from core.config import DEFAULT_CLINIC, MODULES
+from db.tenancy import shards
+
+logger = logging.getLogger(__name__)
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class WarmUp:
+    """
+    Runs the slow start-up steps once, after the app has started serving.
+
+    Importing the app only builds routers; opening databases, applying
+    migrations and priming caches happen here. The readiness endpoint
+    reports `ready` only after every step has finished.
+    """
+
+    def __init__(self, steps: Sequence[Callable[[], None]]):
+        self.steps = list(steps)
+        self.ready = False
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            for step in self.steps:
+                step()
+        except Exception as error:
+            self.error = f"{type(error).__name__}: {error}"
+            logger.exception("Warm-up failed")
+            return
+        self.seconds = time.perf_counter() - started
+        self.ready = True
+
+    def status(self) -> dict:
+        if self.ready:
+            return {"status": "ready", "warm_up_seconds": round(self.seconds, 3)}
+        if self.error:
+            return {"status": "failed", "error": self.error}
+        return {"status": "starting"}
+
+
+def open_default_shard():
+    # Applies pending migrations and loads the module list into the cache
+    modules = shards.get(DEFAULT_CLINIC).list_modules()
+    # Permission bits are laid out from MODULES, so the two must agree
+    if set(modules) != set(MODULES):
+        logger.warning("core.config.MODULES %s does not match the modules table %s", MODULES, sorted(modules))
+
+
+warm_up = WarmUp([open_default_shard, audit_log.prepare])
+
+
+def parse_import_times(output: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `python -X importtime` output into (module, self_us, cumulative_us, depth).
+    """
+    rows = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            rows.append((module, int(own), int(cumulative), (len(indent) - 1) // 2))
+    return rows
+
+
+def profile_imports(module: str = "main", cwd: Optional[str] = None) -> List[Tuple[str, int, int, int]]:
+    """
+    Import `module` in a fresh interpreter and return its per-module import costs.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_import_times(result.stderr)
@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional
+from db.connection import connect
+from db.migrations import Migration
+
+# The audit log is a separate append-only database so its writes never
+# contend with the clinic databases' writer lock.
+AUDIT_MIGRATIONS: List[Migration] = [
+    (1, "audit log", [
+        """
+        CREATE TABLE IF NOT EXISTS audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts TEXT NOT NULL,
+            clinic TEXT NOT NULL,
+            username TEXT NOT NULL,
+            action TEXT NOT NULL,
+            patient_id INTEGER,
+            target TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_clinic_ts ON audit_log (clinic, ts)",
+        "CREATE INDEX IF NOT EXISTS idx_audit_log_patient_ts ON audit_log (clinic, patient_id, ts)",
+        # Append-only: reject any change to rows already written
+        """
+        CREATE TRIGGER IF NOT EXISTS audit_log_no_update BEFORE UPDATE ON audit_log
+        BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS audit_log_no_delete BEFORE DELETE ON audit_log
+        BEGIN SELECT RAISE(ABORT, 'audit log is append-only'); END
+        """,
+    ]),
+]
+
+AUDIT_COLUMNS = ["id", "ts", "clinic", "username", "action", "patient_id", "target"]
+
+
+def write_events(db_path: str, events: List[Dict]):
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany("""
+                INSERT INTO audit_log (ts, clinic, username, action, patient_id, target)
+                VALUES (:ts, :clinic, :username, :action, :patient_id, :target)
+            """, events)
+    finally:
+        conn.close()
+
+
+def query_events(
+    db_path: str,
+    clinic: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    username: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    limit: int = 100,
+) -> List[Dict]:
+    conditions = ["clinic = ?"]
+    params: list = [clinic]
+    if patient_id is not None:
+        conditions.append("patient_id = ?")
+        params.append(patient_id)
+    if start:
+        conditions.append("ts >= ?")
+        params.append(start)
+    if end:
+        conditions.append("ts < ?")
+        params.append(end)
+    if username:
+        conditions.append("username = ?")
+        params.append(username)
+    params.append(limit)
+    conn = connect(db_path)
+    try:
+        rows = conn.execute(f"""
+            SELECT {', '.join(AUDIT_COLUMNS)} FROM audit_log
+            WHERE {' AND '.join(conditions)}
+            ORDER BY ts DESC, id DESC
+            LIMIT ?
+        """, params).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(AUDIT_COLUMNS, row)) for row in rows]
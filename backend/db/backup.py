@@ -0,0 +1,93 @@
+import fcntl
+import gzip
+import os
+import shutil
+import sqlite3
+from datetime import datetime, timezone
+from typing import IO, List, Optional
+from core.config import BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP
+
+
+class BackupError(Exception):
+    pass
+
+
+def backup_database(
+    db_path: str,
+    dest_path: str,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep: float = BACKUP_STEP_SLEEP,
+    compress: bool = False,
+    verify: bool = True,
+) -> str:
+    """
+    Copy a live database with SQLite's online backup API and return the snapshot path.
+
+    Pages are copied `pages` at a time with `sleep` seconds between steps, so
+    the source is only locked for the duration of one step and writers keep
+    going. The snapshot is written to a .partial file, checked with
+    PRAGMA integrity_check and only then moved (or gzipped and moved) into
+    place, so a snapshot path never holds a partial file.
+    """
+    if not os.path.exists(db_path):
+        raise BackupError(f"{db_path} does not exist")
+    os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+    partial_path = dest_path + ".partial"
+    packed_path = dest_path + ".gz.partial"
+    try:
+        source = sqlite3.connect(db_path)
+        target = sqlite3.connect(partial_path)
+        try:
+            source.backup(target, pages=pages, sleep=sleep)
+            if verify:
+                result = target.execute("PRAGMA integrity_check").fetchone()[0]
+                if result != "ok":
+                    raise BackupError(f"Integrity check failed for snapshot of {db_path}: {result}")
+        finally:
+            target.close()
+            source.close()
+        if compress:
+            dest_path += ".gz"
+            with open(partial_path, "rb") as raw, gzip.open(packed_path, "wb") as packed:
+                shutil.copyfileobj(raw, packed)
+            os.replace(packed_path, dest_path)
+        else:
+            os.replace(partial_path, dest_path)
+        return dest_path
+    finally:
+        for leftover in (partial_path, packed_path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def snapshot_path(directory: str, name: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return os.path.join(directory, f"{name}-{stamp}.db")
+
+
+def acquire_backup_lock(directory: str) -> Optional[IO]:
+    """
+    Take the exclusive lock that makes one process the backup scheduler.
+
+    Returns the open lock file, which holds the lock until it is closed, or
+    None when another process already holds it.
+    """
+    os.makedirs(directory, exist_ok=True)
+    lock_file = open(os.path.join(directory, ".scheduler.lock"), "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def backup_clinics(router, directory: str, compress: bool = False) -> List[str]:
+    """
+    Snapshot every clinic database on disk into `directory`.
+    """
+    return [
+        backup_database(router.path_for(clinic), snapshot_path(directory, clinic), compress=compress)
+        for clinic in router.list_clinics()
+        if os.path.exists(router.path_for(clinic))
+    ]
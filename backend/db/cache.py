@@ -0,0 +1,82 @@
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List
+from db.connection import connect
+
+# Tables whose writes are counted in table_versions (see migration 3)
+TRACKED_TABLES = ["users", "patients", "modules"]
+
+
+def table_version_triggers(tables: Iterable[str]) -> List[str]:
+    """
+    DDL for triggers that bump a table's row in table_versions on every write.
+    """
+    statements = []
+    for table in tables:
+        for operation in ("INSERT", "UPDATE", "DELETE"):
+            statements.append(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_{operation.lower()}_version
+                AFTER {operation} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                END
+            """)
+    return statements
+
+
+class CacheCoherence:
+    """
+    Per-table in-process caches that stay correct when other workers write.
+
+    Every read first polls PRAGMA data_version on a long-lived connection,
+    which only changes when another connection has committed. Only then is
+    table_versions read, and only the caches of tables whose version moved
+    are dropped. Cached values are shared, so callers must not mutate them.
+    """
+
+    def __init__(self, db_path: str, tables: Iterable[str] = TRACKED_TABLES):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_version = None
+        self._table_versions: Dict[str, int] = {}
+        self._caches: Dict[str, Dict] = {table: {} for table in tables}
+        self._generations: Dict[str, int] = {table: 0 for table in tables}
+
+    def _sync(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, check_same_thread=False)
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        versions = dict(self._conn.execute("SELECT name, version FROM table_versions").fetchall())
+        for table, cache in self._caches.items():
+            if versions.get(table) != self._table_versions.get(table):
+                cache.clear()
+                self._generations[table] += 1
+        self._table_versions = versions
+
+    def get(self, table: str, key: Hashable, loader: Callable):
+        with self._lock:
+            self._sync()
+            cache = self._caches[table]
+            if key in cache:
+                self.hits += 1
+                return cache[key]
+            self.misses += 1
+            generation = self._generations[table]
+        value = loader()
+        with self._lock:
+            # Drop the value if the table was invalidated while it was loading;
+            # missing rows are not cached so unknown keys cannot grow the cache
+            if value is not None and self._generations[table] == generation:
+                cache[key] = value
+        return value
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,49 @@
+import sqlite3
+from typing import List, Tuple
+
+# Change tracking for delta sync. Every patient write takes the next value of
+# the 'patients' sequence inside its own transaction, and deletions leave a
+# tombstone carrying a sequence value, so `GET /patients/changes?since=<seq>`
+# can return everything that happened after a client's cursor.
+
+PATIENT_TOMBSTONE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS patients_delete_tombstone AFTER DELETE ON patients
+    BEGIN
+        UPDATE change_sequences SET value = value + 1 WHERE name = 'patients';
+        INSERT OR REPLACE INTO patient_tombstones (patient_id, change_seq, deleted_at)
+        VALUES (OLD.id, (SELECT value FROM change_sequences WHERE name = 'patients'), datetime('now'));
+    END
+"""
+
+
+def next_change_seq(cursor: sqlite3.Cursor, name: str = "patients") -> int:
+    # The UPDATE takes the write lock, so sequence values are handed out in commit order
+    cursor.execute("UPDATE change_sequences SET value = value + 1 WHERE name = ?", (name,))
+    cursor.execute("SELECT value FROM change_sequences WHERE name = ?", (name,))
+    return cursor.fetchone()[0]
+
+
+def read_patient_changes(conn: sqlite3.Connection, columns: List[str], since: int, limit: int) -> Tuple[List[Tuple[int, tuple]], List[Tuple[int, int]], bool]:
+    """
+    Return (seq, row) pairs of changed patients and (seq, id) pairs of deleted
+    ones after `since`, merged up to `limit` entries, plus whether more remain.
+    """
+    updated = conn.execute(f"""
+        SELECT change_seq, {', '.join(columns)} FROM patients
+        WHERE change_seq > ? ORDER BY change_seq LIMIT ?
+    """, (since, limit + 1)).fetchall()
+    deleted = conn.execute("""
+        SELECT change_seq, patient_id FROM patient_tombstones
+        WHERE change_seq > ? ORDER BY change_seq LIMIT ?
+    """, (since, limit + 1)).fetchall()
+    merged = sorted(
+        [(row[0], "updated", row[1:]) for row in updated] + [(row[0], "deleted", row[1]) for row in deleted],
+        key=lambda entry: entry[0],
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+    return (
+        [(seq, value) for seq, kind, value in merged if kind == "updated"],
+        [(seq, value) for seq, kind, value in merged if kind == "deleted"],
+        has_more,
+    )
@@ -0,0 +1,9 @@
+import sqlite3
+
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    """
+    sqlite3.connect that also takes "file:" URIs, such as the shared-cache
+    in-memory databases the test harness uses.
+    """
+    return sqlite3.connect(db_path, uri=db_path.startswith("file:"), **kwargs)
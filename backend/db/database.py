@@ -1,111 +1,62 @@
-import sqlite3
-from typing import Dict, List, Optional
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
 import json
+from core.config import DATABASE_PATH, DUPLICATE_MAX_CANDIDATES, DUPLICATE_MIN_SCORE, PATIENT_FIELDS, PATIENT_SUMMARY_FIELDS, READ_REPLICA
+from db.cache import CacheCoherence
+from db.changes import next_change_seq, read_patient_changes
+from db.connection import connect
+from db.duplicates import find_candidates, find_duplicate_pairs, insert_blocking_keys, replace_blocking_keys
+from db.migrations import apply_migrations, get_version, latest_version
+from db.replica import ReadReplica
+from db.rows import ModuleRow, PatientRow, UserRow
+from db.stats import read_patient_stats, rebuild_patient_stats, record_last_visit_changed, record_patient_created
 
 
 class SQLiteDatabase:
-    def __init__(self, db_path: str = "./db/clinikit.db"):
+    def __init__(self, db_path: str = DATABASE_PATH, replica: bool = READ_REPLICA):
         self.db_path = db_path
         self._initialize_database()
+        # Read caches for users, modules and patient lists, invalidated on writes from any worker
+        self._cache = CacheCoherence(db_path)
+        # Optional in-memory copy of the hot tables that serves reads without file I/O
+        self._replica = ReadReplica(db_path) if replica else None
 
     def _connect(self):
-        return sqlite3.connect(self.db_path)
+        return connect(self.db_path)
 
     def _initialize_database(self):
+        # Only a version check on startup; the schema itself lives in db/migrations.py
         with self._connect() as conn:
-            cursor = conn.cursor()
-            # Create users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    username TEXT PRIMARY KEY,
-                    password TEXT NOT NULL,
-                    permissions TEXT NOT NULL
-                )
-            """)
-            # Create patients table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS patients (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    date_of_birth TEXT NOT NULL,
-                    gender TEXT NOT NULL,
-                    last_visit TEXT NOT NULL,
-                    contact TEXT NOT NULL,
-                    emergency_contact TEXT NOT NULL,
-                    insurance TEXT NOT NULL,
-                    medical_history TEXT,
-                    notes TEXT
-                )
-            """)
+            version = get_version(conn)
+        if version < latest_version():
+            apply_migrations(self.db_path)
 
-            cursor.execute("""
-                           CREATE TABLE IF NOT EXISTS modules (
-                            id TEXT PRIMARY KEY,
-                            href TEXT NOT NULL,
-                            title TEXT NOT NULL,
-                            description TEXT NOT NULL,
-                            icon TEXT NOT NULL
-                        );
-            """)
-            conn.commit()
-            self._initialize_default_data()
-
-    def _initialize_default_data(self):
-        # Insert default users if they don't exist
-        default_users = {
-            "admin": {
-                "password": "password",
-                "permissions": '{"patient_mgmt": "Edit", "user_mgmt": "Edit", "appointments": "Edit"}',
-            },
-            "doc": {
-                "password": "password",
-                "permissions": '{"patient_mgmt": "View", "user_mgmt": "None", "appointments": "View"}',
-            },
-        }
-        with self._connect() as conn:
-            cursor = conn.cursor()
-            for username, data in default_users.items():
-                cursor.execute("""
-                    INSERT OR IGNORE INTO users (username, password, permissions)
-                    VALUES (?, ?, ?)
-                """, (username, data["password"], data["permissions"]))
-            
-           # Insert default modules if they don't exist
-            cursor.execute("""
-                INSERT OR IGNORE INTO modules (id, href, title, description, icon) VALUES
-                ('patient_mgmt', '/patients', 'Patient Management', 'View, add, and edit patient records.', 'Users'),
-                ('user_mgmt', '/users', 'User Management', 'Add, remove, and manage system users.', 'User'),
-                ('appointments', '/appointments', 'Appointments', 'Manage patient appointments.', 'Calendar');
-            """)
-            conn.commit()
+    def close(self):
+        self._cache.close()
+        if self._replica is not None:
+            self._replica.close()
 
     # User operations
-    def get_user(self, username: str) -> Optional[Dict]:
+    def get_user(self, username: str) -> Optional[UserRow]:
+        if self._replica is not None:
+            return self._replica.get_user(username)
+        return self._cache.get("users", username, lambda: self._load_user(username))
+
+    def _load_user(self, username: str) -> Optional[UserRow]:
         with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT username, password, permissions FROM users WHERE username = ?", (username,))
             row = cursor.fetchone()
             if row:
-                return {
-                    "username": row[0],
-                    "password": row[1],
-                    "permissions": json.loads(row[2]),
-                }
+                return UserRow.from_db(row)
             return None
 
-    def list_users(self) -> List[Dict]:
+    def list_users(self) -> List[UserRow]:
         with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT username, password, permissions FROM users")
             rows = cursor.fetchall()
-            return [
-                {
-                    "username": row[0],
-                    "password": row[1],
-                    "permissions": json.loads(row[2]),
-                }
-                for row in rows
-            ]
+            return [UserRow.from_db(row) for row in rows]
 
     def update_user_permissions(self, username: str, permissions: Dict[str, str]) -> bool:
         with self._connect() as conn:
@@ -118,70 +69,81 @@ class SQLiteDatabase:
             conn.commit()
             return cursor.rowcount > 0
     
-    def list_modules(self) -> Dict[str, Dict]:
+    def list_modules(self) -> Dict[str, ModuleRow]:
+        if self._replica is not None:
+            return self._replica.list_modules()
+        return self._cache.get("modules", None, self._load_modules)
+
+    def _load_modules(self) -> Dict[str, ModuleRow]:
         with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, href, title, description, icon FROM modules")
             rows = cursor.fetchall()
-            return {
-                row[0]: {
-                    "href": row[1],
-                    "title": row[2],
-                    "description": row[3],
-                    "icon": row[4],
-                }
-                for row in rows
-            }
+            return {row[0]: ModuleRow.from_values(ModuleRow.__slots__, row[1:]) for row in rows}
+
     # Patient operations
-    def list_patients_summary(self) -> List[Dict]:
+    def _patient_columns(self, fields: Optional[Iterable[str]], default: List[str]) -> List[str]:
+        if not fields:
+            return default
+        unknown = set(fields) - set(PATIENT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown patient fields: {', '.join(sorted(unknown))}")
+        # Keep the whitelist order and always include the id
+        return [column for column in PATIENT_FIELDS if column == "id" or column in fields]
+
+    def list_patients_summary(self, fields: Optional[Iterable[str]] = None) -> List[PatientRow]:
+        columns = self._patient_columns(fields, PATIENT_SUMMARY_FIELDS)
+        # Every spelling of the same selection shares one cache entry
+        return self._cache.get("patients", tuple(columns), lambda: self._load_patients_summary(columns))
+
+    def _load_patients_summary(self, columns: List[str]) -> List[PatientRow]:
+        if self._replica is not None and self._replica.has_patients:
+            patients = self._replica.list_patients(columns)
+            # The replica drops patients once they exceed its memory budget
+            if self._replica.has_patients:
+                return patients
         with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, name, date_of_birth, gender, last_visit
-                FROM patients
-            """)
+            # Column names come from the PATIENT_FIELDS whitelist, never from user input
+            cursor.execute(f"SELECT {', '.join(columns)} FROM patients")
             rows = cursor.fetchall()
-            return [
-                {
-                    "id": row[0],
-                    "name": row[1],
-                    "date_of_birth": row[2],
-                    "gender": row[3],
-                    "last_visit": row[4],
-                }
-                for row in rows
-            ]
-
-    def get_patient(self, patient_id: int) -> Optional[Dict]:
+            return [PatientRow.from_db(columns, row) for row in rows]
+
+    def get_patient(self, patient_id: int, fields: Optional[Iterable[str]] = None) -> Optional[PatientRow]:
+        columns = self._patient_columns(fields, PATIENT_FIELDS)
+        if self._replica is not None and self._replica.has_patients:
+            patient = self._replica.get_patient(patient_id, columns)
+            if self._replica.has_patients:
+                return patient
         with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, name, date_of_birth, gender, last_visit, contact, emergency_contact, insurance, medical_history, notes
-                FROM patients
-                WHERE id = ?
-            """, (patient_id,))
+            cursor.execute(f"SELECT {', '.join(columns)} FROM patients WHERE id = ?", (patient_id,))
             row = cursor.fetchone()
             if row:
-                return {
-                    "id": row[0],
-                    "name": row[1],
-                    "date_of_birth": row[2],
-                    "gender": row[3],
-                    "last_visit": row[4],
-                    "contact": json.loads(row[5]),
-                    "emergency_contact": json.loads(row[6]),
-                    "insurance": row[7],
-                    "medical_history": row[8],
-                    "notes": row[9],
-                }
+                return PatientRow.from_db(columns, row)
             return None
 
+    def get_patients(self, patient_ids: List[int], fields: Optional[Iterable[str]] = None) -> Dict[int, PatientRow]:
+        """
+        Fetch several patients with one query, keyed by id. Missing ids are left out.
+        """
+        if not patient_ids:
+            return {}
+        columns = self._patient_columns(fields, PATIENT_FIELDS)
+        placeholders = ", ".join("?" for _ in patient_ids)
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(columns)} FROM patients WHERE id IN ({placeholders})", list(patient_ids))
+            rows = cursor.fetchall()
+            return {row[0]: PatientRow.from_db(columns, row) for row in rows}
+
     def create_patient(self, patient_data: Dict) -> Dict:
         with self._connect() as conn:
             cursor = conn.cursor()
+            change_seq = next_change_seq(cursor)
             cursor.execute("""
-                INSERT INTO patients (name, date_of_birth, gender, last_visit, contact, emergency_contact, insurance, medical_history, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO patients (name, date_of_birth, gender, last_visit, contact, emergency_contact, insurance, medical_history, notes, change_seq, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 patient_data["name"],
                 patient_data["date_of_birth"],
@@ -192,20 +154,26 @@ class SQLiteDatabase:
                 patient_data["insurance"],
                 patient_data.get("medical_history"),
                 patient_data.get("notes"),
+                change_seq,
+                datetime.now(timezone.utc).isoformat(),
             ))
-            conn.commit()
             patient_data["id"] = cursor.lastrowid
+            insert_blocking_keys(cursor, patient_data["id"], patient_data["name"], patient_data["date_of_birth"])
+            record_patient_created(cursor, patient_data["last_visit"])
+            conn.commit()
             return patient_data
 
-    def update_patient(self, patient_id: int, updates: Dict) -> Optional[Dict]:
+    def update_patient(self, patient_id: int, updates: Dict) -> Optional[PatientRow]:
         patient = self.get_patient(patient_id)
         if not patient:
             return None
         with self._connect() as conn:
             cursor = conn.cursor()
+            change_seq = next_change_seq(cursor)
             cursor.execute("""
                 UPDATE patients
-                SET name = ?, date_of_birth = ?, gender = ?, last_visit = ?, contact = ?, emergency_contact = ?, insurance = ?, medical_history = ?, notes = ?
+                SET name = ?, date_of_birth = ?, gender = ?, last_visit = ?, contact = ?, emergency_contact = ?, insurance = ?, medical_history = ?, notes = ?,
+                    change_seq = ?, updated_at = ?
                 WHERE id = ?
             """, (
                 updates.get("name", patient["name"]),
@@ -217,7 +185,65 @@ class SQLiteDatabase:
                 updates.get("insurance", patient["insurance"]),
                 updates.get("medical_history", patient["medical_history"]),
                 updates.get("notes", patient["notes"]),
+                change_seq,
+                datetime.now(timezone.utc).isoformat(),
                 patient_id,
             ))
+            name = updates.get("name", patient["name"])
+            date_of_birth = updates.get("date_of_birth", patient["date_of_birth"])
+            if (name, date_of_birth) != (patient["name"], patient["date_of_birth"]):
+                replace_blocking_keys(cursor, patient_id, name, date_of_birth)
+            record_last_visit_changed(cursor, patient["last_visit"], updates.get("last_visit", patient["last_visit"]))
+            conn.commit()
+            return self.get_patient(patient_id)
+
+    # Duplicate detection
+    def find_duplicate_candidates(
+        self,
+        name: str,
+        date_of_birth: str,
+        exclude_id: Optional[int] = None,
+        min_score: float = DUPLICATE_MIN_SCORE,
+        limit: int = DUPLICATE_MAX_CANDIDATES,
+    ) -> List[Dict]:
+        """
+        Existing patients that are likely the same person, best match first.
+        """
+        with self._connect() as conn:
+            matches = find_candidates(conn, PATIENT_SUMMARY_FIELDS, name, date_of_birth, min_score, limit, exclude_id)
+        return [
+            {"score": round(score, 3), "patient": PatientRow.from_db(PATIENT_SUMMARY_FIELDS, row)}
+            for score, row in matches
+        ]
+
+    def find_duplicate_pairs(self, min_score: float = DUPLICATE_MIN_SCORE) -> List[Dict]:
+        """
+        Likely duplicate pairs across the whole table, for periodic clean-up.
+        """
+        with self._connect() as conn:
+            pairs = find_duplicate_pairs(conn, min_score)
+        return [{"score": round(score, 3), "patient_ids": [first, second]} for score, first, second in pairs]
+
+    def list_patient_changes(self, since: int, limit: int) -> Dict:
+        """
+        Patients changed and ids deleted after the `since` cursor, oldest first.
+        """
+        with self._connect() as conn:
+            updated, deleted, has_more = read_patient_changes(conn, PATIENT_FIELDS, since, limit)
+        sequences = [seq for seq, _ in updated] + [seq for seq, _ in deleted]
+        return {
+            "patients": [PatientRow.from_db(PATIENT_FIELDS, row) for _, row in updated],
+            "deleted": [patient_id for _, patient_id in deleted],
+            "cursor": max(sequences, default=since),
+            "has_more": has_more,
+        }
+
+    # Dashboard statistics
+    def get_patient_stats(self, overdue_before: str) -> Dict[str, int]:
+        with self._connect() as conn:
+            return read_patient_stats(conn, overdue_before)
+
+    def rebuild_patient_stats(self):
+        with self._connect() as conn:
+            rebuild_patient_stats(conn)
             conn.commit()
-            return self.get_patient(patient_id)
\ No newline at end of file
@@ -0,0 +1,133 @@
+import sqlite3
+import unicodedata
+from difflib import SequenceMatcher
+from typing import List, Optional, Set, Tuple
+
+# Duplicate-patient detection. Each patient gets one blocking key per name
+# token, "<soundex>|<date_of_birth>", in the patient_blocking_keys side table.
+# Candidates for a new chart are only the patients sharing a key with it, so
+# intake checks read a handful of rows instead of the whole table, and only
+# those are scored with the fuzzy matcher.
+
+PATIENT_BLOCKING_KEYS_DELETE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS patients_delete_blocking_keys AFTER DELETE ON patients
+    BEGIN
+        DELETE FROM patient_blocking_keys WHERE patient_id = OLD.id;
+    END
+"""
+
+SOUNDEX_DIGITS = {
+    letter: digit
+    for letters, digit in (("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"), ("L", "4"), ("MN", "5"), ("R", "6"))
+    for letter in letters
+}
+
+
+def name_tokens(name: str) -> List[str]:
+    """
+    Lowercase ASCII words of a name, with accents folded ("José" -> "jose").
+    """
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    return "".join(char if char.isalpha() else " " for char in folded).split()
+
+
+def soundex(word: str) -> str:
+    letters = [char for char in word.upper() if "A" <= char <= "Z"]
+    if not letters:
+        return ""
+    code = letters[0]
+    previous = SOUNDEX_DIGITS.get(letters[0], "")
+    for letter in letters[1:]:
+        digit = SOUNDEX_DIGITS.get(letter, "")
+        if digit and digit != previous:
+            code += digit
+        # H and W do not separate letters with the same code
+        if letter not in "HW":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def blocking_keys(name: str, date_of_birth: str) -> Set[str]:
+    return {f"{soundex(token)}|{date_of_birth}" for token in name_tokens(name) if len(token) > 1}
+
+
+def name_similarity(first: str, second: str) -> float:
+    """
+    Fuzzy similarity of two names in [0, 1], ignoring case, accents and word order.
+    """
+    first_tokens, second_tokens = name_tokens(first), name_tokens(second)
+    return max(
+        SequenceMatcher(None, " ".join(first_tokens), " ".join(second_tokens)).ratio(),
+        SequenceMatcher(None, " ".join(sorted(first_tokens)), " ".join(sorted(second_tokens))).ratio(),
+    )
+
+
+def insert_blocking_keys(cursor: sqlite3.Cursor, patient_id: int, name: str, date_of_birth: str):
+    """
+    Add the keys of a patient that has none yet, such as a new one.
+    """
+    cursor.executemany(
+        "INSERT OR IGNORE INTO patient_blocking_keys (key, patient_id) VALUES (?, ?)",
+        [(key, patient_id) for key in blocking_keys(name, date_of_birth)],
+    )
+
+
+def replace_blocking_keys(cursor: sqlite3.Cursor, patient_id: int, name: str, date_of_birth: str):
+    cursor.execute("DELETE FROM patient_blocking_keys WHERE patient_id = ?", (patient_id,))
+    insert_blocking_keys(cursor, patient_id, name, date_of_birth)
+
+
+def backfill_blocking_keys(conn: sqlite3.Connection):
+    cursor = conn.cursor()
+    for patient_id, name, date_of_birth in conn.execute("SELECT id, name, date_of_birth FROM patients").fetchall():
+        insert_blocking_keys(cursor, patient_id, name, date_of_birth)
+
+
+def find_candidates(
+    conn: sqlite3.Connection,
+    columns: List[str],
+    name: str,
+    date_of_birth: str,
+    min_score: float,
+    limit: int,
+    exclude_id: Optional[int] = None,
+) -> List[Tuple[float, tuple]]:
+    """
+    Score the patients sharing a blocking key with `name` and `date_of_birth`
+    and return (score, row) pairs at or above `min_score`, best first.
+    `columns` must start with "id" and "name".
+    """
+    keys = sorted(blocking_keys(name, date_of_birth))
+    if not keys:
+        return []
+    placeholders = ", ".join("?" for _ in keys)
+    rows = conn.execute(f"""
+        SELECT {', '.join(columns)} FROM patients
+        WHERE id IN (SELECT patient_id FROM patient_blocking_keys WHERE key IN ({placeholders}))
+    """, keys).fetchall()
+    scored = [(name_similarity(name, row[1]), row) for row in rows if row[0] != exclude_id]
+    scored = [(score, row) for score, row in scored if score >= min_score]
+    scored.sort(key=lambda entry: (-entry[0], entry[1][0]))
+    return scored[:limit]
+
+
+def find_duplicate_pairs(conn: sqlite3.Connection, min_score: float) -> List[Tuple[float, int, int]]:
+    """
+    Every pair of existing patients that share a blocking key and score at
+    least `min_score`, as (score, lower_id, higher_id), best first.
+    """
+    pairs = conn.execute("""
+        SELECT DISTINCT a.patient_id, b.patient_id
+        FROM patient_blocking_keys a
+        JOIN patient_blocking_keys b ON b.key = a.key AND b.patient_id > a.patient_id
+    """).fetchall()
+    ids = sorted({patient_id for pair in pairs for patient_id in pair})
+    names = {}
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        names.update(conn.execute(
+            f"SELECT id, name FROM patients WHERE id IN ({', '.join('?' for _ in chunk)})", chunk
+        ).fetchall())
+    scored = [(name_similarity(names[first], names[second]), first, second) for first, second in pairs]
+    return sorted((entry for entry in scored if entry[0] >= min_score), key=lambda entry: (-entry[0], entry[1], entry[2]))
@@ -0,0 +1,183 @@
+import sqlite3
+from typing import Callable, List, Tuple, Union
+from db.cache import TRACKED_TABLES, table_version_triggers
+from db.changes import PATIENT_TOMBSTONE_TRIGGER
+from db.connection import connect
+from db.duplicates import PATIENT_BLOCKING_KEYS_DELETE_TRIGGER, backfill_blocking_keys
+from db.stats import rebuild_patient_stats
+
+
+
+class Standalone(str):
+    """
+    A statement run in its own autocommit transaction ahead of the migration
+    transaction, used for large index builds. It must be idempotent
+    (e.g. CREATE INDEX IF NOT EXISTS) because concurrent workers may both run it.
+    """
+
+
+# A step is a SQL statement, a Standalone statement or a callable receiving the open connection
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+Migration = Tuple[int, str, List[Step]]
+
+# Ordered schema migrations tracked through PRAGMA user_version.
+# Never edit a migration once it has shipped; append a new one instead.
+# Each migration runs in its own transaction. Standalone steps run before it,
+# one transaction each, so several index builds never share one long write lock.
+MIGRATIONS: List[Migration] = [
+    (1, "initial schema and default data", [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password TEXT NOT NULL,
+            permissions TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS patients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            date_of_birth TEXT NOT NULL,
+            gender TEXT NOT NULL,
+            last_visit TEXT NOT NULL,
+            contact TEXT NOT NULL,
+            emergency_contact TEXT NOT NULL,
+            insurance TEXT NOT NULL,
+            medical_history TEXT,
+            notes TEXT
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS modules (
+            id TEXT PRIMARY KEY,
+            href TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            icon TEXT NOT NULL
+        )
+        """,
+        """
+        INSERT OR IGNORE INTO users (username, password, permissions) VALUES
+        ('admin', 'password', '{"patient_mgmt": "Edit", "user_mgmt": "Edit", "appointments": "Edit"}'),
+        ('doc', 'password', '{"patient_mgmt": "View", "user_mgmt": "None", "appointments": "View"}')
+        """,
+        """
+        INSERT OR IGNORE INTO modules (id, href, title, description, icon) VALUES
+        ('patient_mgmt', '/patients', 'Patient Management', 'View, add, and edit patient records.', 'Users'),
+        ('user_mgmt', '/users', 'User Management', 'Add, remove, and manage system users.', 'User'),
+        ('appointments', '/appointments', 'Appointments', 'Manage patient appointments.', 'Calendar')
+        """,
+    ]),
+    (2, "dashboard statistics counters", [
+        """
+        CREATE TABLE IF NOT EXISTS patient_stats (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS patient_last_visit_counts (
+            last_visit TEXT PRIMARY KEY,
+            count INTEGER NOT NULL
+        )
+        """,
+        rebuild_patient_stats,
+    ]),
+    (3, "per-table change counters for cache coherence", [
+        """
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        """,
+        *[f"INSERT OR IGNORE INTO table_versions (name, version) VALUES ('{table}', 0)" for table in TRACKED_TABLES],
+        *table_version_triggers(TRACKED_TABLES),
+    ]),
+    (4, "patient change tracking and tombstones", [
+        "ALTER TABLE patients ADD COLUMN change_seq INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE patients ADD COLUMN updated_at TEXT",
+        """
+        CREATE TABLE IF NOT EXISTS change_sequences (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        """,
+        # Existing rows become changes 1..n in id order
+        "UPDATE patients SET change_seq = id",
+        "INSERT OR IGNORE INTO change_sequences (name, value) SELECT 'patients', COALESCE(MAX(id), 0) FROM patients",
+        """
+        CREATE TABLE IF NOT EXISTS patient_tombstones (
+            patient_id INTEGER PRIMARY KEY,
+            change_seq INTEGER NOT NULL,
+            deleted_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_patient_tombstones_change_seq ON patient_tombstones (change_seq)",
+        PATIENT_TOMBSTONE_TRIGGER,
+    ]),
+    (5, "index patients by change sequence", [
+        Standalone("CREATE INDEX IF NOT EXISTS idx_patients_change_seq ON patients (change_seq)"),
+    ]),
+    (6, "blocking keys for duplicate-patient detection", [
+        """
+        CREATE TABLE IF NOT EXISTS patient_blocking_keys (
+            key TEXT NOT NULL,
+            patient_id INTEGER NOT NULL,
+            PRIMARY KEY (key, patient_id)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_patient_blocking_keys_patient ON patient_blocking_keys (patient_id)",
+        PATIENT_BLOCKING_KEYS_DELETE_TRIGGER,
+        backfill_blocking_keys,
+    ]),
+]
+
+
+def latest_version(migrations: List[Migration] = MIGRATIONS) -> int:
+    return migrations[-1][0] if migrations else 0
+
+
+def get_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def pending_migrations(conn: sqlite3.Connection, migrations: List[Migration] = MIGRATIONS) -> List[Migration]:
+    version = get_version(conn)
+    return [migration for migration in migrations if migration[0] > version]
+
+
+def apply_migrations(db_path: str, migrations: List[Migration] = MIGRATIONS) -> int:
+    """
+    Apply every pending migration in order and return the resulting schema version.
+    """
+    # Autocommit mode so transactions are controlled explicitly below
+    conn = connect(db_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        # WAL lets readers keep going while a migration holds the write lock
+        conn.execute("PRAGMA journal_mode = WAL")
+        for version, _description, steps in pending_migrations(conn, migrations):
+            for step in steps:
+                if isinstance(step, Standalone):
+                    conn.execute(step)
+            # Take the write lock before re-checking so concurrent workers migrate once
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if get_version(conn) >= version:
+                    conn.execute("ROLLBACK")
+                    continue
+                for step in steps:
+                    if isinstance(step, Standalone):
+                        continue
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return get_version(conn)
+    finally:
+        conn.close()
@@ -0,0 +1,129 @@
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional
+from core.config import PATIENT_CHANGES_LIMIT, PATIENT_FIELDS, READ_REPLICA_MAX_BYTES
+from db.changes import read_patient_changes
+from db.connection import connect
+from db.rows import ModuleRow, PatientRow, UserRow
+
+
+def estimate_size(row: PatientRow, values: tuple) -> int:
+    # Rough footprint: the row object plus its stored column values
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
+
+
+class ReadReplica:
+    """
+    In-process copy of the users, modules and patients tables of one database.
+
+    Users and modules are small and are reloaded whenever their
+    table_versions entry moves. Patients are loaded once and then follow
+    the change feed (change_seq and tombstones), so a write costs the
+    replica one row, not a reload. Like CacheCoherence, every read first
+    polls PRAGMA data_version, so writes from this worker and from others
+    are visible to the next read.
+
+    If the patient rows outgrow `max_bytes`, the replica stops holding
+    patients and `has_patients` turns false; callers then read SQLite.
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = READ_REPLICA_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.has_patients = True
+        self.patient_bytes = 0
+        self.users: Dict[str, UserRow] = {}
+        self.modules: Dict[str, ModuleRow] = {}
+        self._patients: Dict[int, PatientRow] = {}
+        self._sizes: Dict[int, int] = {}
+        self._cursor = 0
+        self._unordered = False
+        self._lock = threading.Lock()
+        self._conn = None
+        self._data_version = None
+        self._table_versions: Dict[str, int] = {}
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._conn is None:
+            self._conn = connect(self.db_path, isolation_level=None, check_same_thread=False)
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        # One read transaction so the copy matches a single committed state
+        self._conn.execute("BEGIN")
+        try:
+            versions = dict(self._conn.execute("SELECT name, version FROM table_versions").fetchall())
+            if versions.get("users") != self._table_versions.get("users"):
+                rows = self._conn.execute("SELECT username, password, permissions FROM users").fetchall()
+                self.users = {row[0]: UserRow.from_db(row) for row in rows}
+            if versions.get("modules") != self._table_versions.get("modules"):
+                rows = self._conn.execute("SELECT id, href, title, description, icon FROM modules").fetchall()
+                self.modules = {row[0]: ModuleRow.from_values(ModuleRow.__slots__, row[1:]) for row in rows}
+            if self.has_patients and versions.get("patients") != self._table_versions.get("patients"):
+                self._follow_patient_changes()
+        finally:
+            self._conn.execute("COMMIT")
+        self._data_version = data_version
+        self._table_versions = versions
+
+    def _follow_patient_changes(self):
+        while True:
+            updated, deleted, has_more = read_patient_changes(self._conn, PATIENT_FIELDS, self._cursor, PATIENT_CHANGES_LIMIT)
+            for seq, values in updated:
+                row = PatientRow.from_db(PATIENT_FIELDS, values)
+                patient_id = values[0]
+                if patient_id not in self._patients and self._patients and patient_id < next(reversed(self._patients)):
+                    self._unordered = True
+                self._patients[patient_id] = row
+                size = estimate_size(row, values)
+                self.patient_bytes += size - self._sizes.get(patient_id, 0)
+                self._sizes[patient_id] = size
+                self._cursor = max(self._cursor, seq)
+            for seq, patient_id in deleted:
+                self._patients.pop(patient_id, None)
+                self.patient_bytes -= self._sizes.pop(patient_id, 0)
+                self._cursor = max(self._cursor, seq)
+            if self.patient_bytes > self.max_bytes:
+                self.has_patients = False
+                self._patients, self._sizes, self.patient_bytes = {}, {}, 0
+                return
+            if not has_more:
+                return
+
+    def get_user(self, username: str) -> Optional[UserRow]:
+        with self._lock:
+            self._sync()
+            return self.users.get(username)
+
+    def list_modules(self) -> Dict[str, ModuleRow]:
+        with self._lock:
+            self._sync()
+            return self.modules
+
+    def list_patients(self, columns: List[str]) -> List[PatientRow]:
+        with self._lock:
+            self._sync()
+            if self._unordered:
+                # Keep the SELECT ... FROM patients order (by id) callers saw before
+                self._patients = dict(sorted(self._patients.items()))
+                self._unordered = False
+            return [self._project(row, columns) for row in self._patients.values()]
+
+    def get_patient(self, patient_id: int, columns: List[str]) -> Optional[PatientRow]:
+        with self._lock:
+            self._sync()
+            row = self._patients.get(patient_id)
+            return self._project(row, columns) if row is not None else None
+
+    def _project(self, row: PatientRow, columns: Iterable[str]) -> PatientRow:
+        if len(columns) == len(PATIENT_FIELDS):
+            return row
+        return PatientRow.from_values(columns, (row[column] for column in columns))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
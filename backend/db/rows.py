@@ -0,0 +1,94 @@
+import json
+from typing import Any, Dict, Iterable, List, Sequence
+from core.config import PATIENT_FIELDS
+from core.permissions import compile_permissions
+
+# Columns stored as JSON text that must be decoded on read
+PATIENT_JSON_FIELDS = {"contact", "emergency_contact"}
+
+
+class Row:
+    """
+    Compact read-only record built straight from a result tuple.
+
+    Rows use __slots__ instead of a per-instance dict, and a row read with a
+    sparse column list simply leaves the other slots unset. They still behave
+    like the dicts handlers used before (`row["name"]`, `row.get(...)`,
+    `dict(row)`), so callers do not need to change.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_values(cls, columns: Sequence[str], values: Iterable[Any]) -> "Row":
+        row = cls.__new__(cls)
+        for column, value in zip(columns, values):
+            object.__setattr__(row, column, value)
+        return row
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def keys(self) -> List[str]:
+        return [name for name in self.__slots__ if hasattr(self, name)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if hasattr(self, name)}
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Row):
+            other = other.as_dict()
+        return self.as_dict() == other
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class UserRow(Row):
+    __slots__ = ("username", "password", "permissions", "permission_mask")
+
+    @classmethod
+    def from_db(cls, row: tuple) -> "UserRow":
+        # Compiled once per load so permission checks are a single AND
+        permissions = json.loads(row[2])
+        return cls.from_values(cls.__slots__, (row[0], row[1], permissions, compile_permissions(permissions)))
+
+
+class ModuleRow(Row):
+    __slots__ = ("href", "title", "description", "icon")
+
+
+class PatientRow(Row):
+    __slots__ = tuple(PATIENT_FIELDS)
+
+    @classmethod
+    def from_db(cls, columns: Sequence[str], row: tuple) -> "PatientRow":
+        return cls.from_values(columns, (
+            json.loads(value) if column in PATIENT_JSON_FIELDS else value
+            for column, value in zip(columns, row)
+        ))
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, Row):
+        return obj.as_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize rows, dicts and lists straight to JSON bytes, skipping jsonable_encoder.
+    """
+    return json.dumps(content, default=_encode, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
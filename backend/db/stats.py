@@ -0,0 +1,86 @@
+import sqlite3
+from collections import Counter, defaultdict
+from typing import Dict, Iterable
+
+# Counter tables kept in step with every patient write, so the dashboard never
+# has to scan the patients table. Rebuild them with `python manage.py rebuild-stats`.
+
+
+def _bump_last_visit(cursor: sqlite3.Cursor, last_visit: str, delta: int):
+    cursor.execute("""
+        INSERT INTO patient_last_visit_counts (last_visit, count) VALUES (?, ?)
+        ON CONFLICT(last_visit) DO UPDATE SET count = count + excluded.count
+    """, (last_visit, delta))
+    if delta < 0:
+        cursor.execute("DELETE FROM patient_last_visit_counts WHERE last_visit = ? AND count <= 0", (last_visit,))
+
+
+def record_patient_created(cursor: sqlite3.Cursor, last_visit: str):
+    cursor.execute("""
+        INSERT INTO patient_stats (key, value) VALUES ('total', 1)
+        ON CONFLICT(key) DO UPDATE SET value = value + 1
+    """)
+    _bump_last_visit(cursor, last_visit, 1)
+
+
+def record_last_visit_changed(cursor: sqlite3.Cursor, old_last_visit: str, new_last_visit: str):
+    if old_last_visit == new_last_visit:
+        return
+    _bump_last_visit(cursor, old_last_visit, -1)
+    _bump_last_visit(cursor, new_last_visit, 1)
+
+
+def rebuild_patient_stats(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM patient_stats")
+    conn.execute("DELETE FROM patient_last_visit_counts")
+    conn.execute("INSERT INTO patient_stats (key, value) SELECT 'total', COUNT(*) FROM patients")
+    conn.execute("""
+        INSERT INTO patient_last_visit_counts (last_visit, count)
+        SELECT last_visit, COUNT(*) FROM patients GROUP BY last_visit
+    """)
+
+
+def read_patient_stats(conn: sqlite3.Connection, overdue_before: str) -> Dict[str, int]:
+    total = conn.execute("SELECT value FROM patient_stats WHERE key = 'total'").fetchone()
+    # Sums one row per distinct visit date, not one per patient
+    overdue = conn.execute(
+        "SELECT COALESCE(SUM(count), 0) FROM patient_last_visit_counts WHERE last_visit < ?",
+        (overdue_before,),
+    ).fetchone()
+    return {"total": total[0] if total else 0, "overdue": overdue[0]}
+
+
+class AppointmentCounts:
+    """
+    Appointment counts by date and status. Appointments are still held in
+    memory by api/appointments.py, so their counters live in memory beside them.
+    """
+
+    def __init__(self):
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+
+    def _bump(self, appt: Dict, delta: int):
+        counts = self._counts[appt["date"]]
+        counts[appt["status"]] += delta
+        if counts[appt["status"]] <= 0:
+            del counts[appt["status"]]
+
+    def add(self, appt: Dict):
+        self._bump(appt, 1)
+
+    def remove(self, appt: Dict):
+        self._bump(appt, -1)
+
+    def rebuild(self, appointments: Iterable[Dict]):
+        self._counts.clear()
+        for appt in appointments:
+            self.add(appt)
+
+    def for_day(self, day: str) -> Dict[str, int]:
+        """
+        Number of appointments per status on the given day.
+        """
+        return dict(self._counts.get(day, {}))
+
+
+appointment_counts = AppointmentCounts()
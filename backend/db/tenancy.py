@@ -0,0 +1,144 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Callable, Dict, List
+from core.config import CLINIC_DB_DIR, DATABASE_PATH, DEFAULT_CLINIC, MAX_OPEN_SHARDS
+from db.database import SQLiteDatabase
+from db.migrations import apply_migrations
+
+# Clinic of the request being handled, set by the tenant middleware
+current_clinic: ContextVar[str] = ContextVar("current_clinic", default=DEFAULT_CLINIC)
+
+CLINIC_ID = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+def is_valid_clinic(clinic: str) -> bool:
+    return bool(CLINIC_ID.match(clinic))
+
+
+class UnknownClinicError(LookupError):
+    """
+    Raised for a clinic whose database has not been provisioned.
+    """
+
+
+class ShardRouter:
+    """
+    Maps clinic ids to their own SQLite files and keeps an LRU of open handles.
+
+    Only clinics provisioned with `manage.py add-clinic` are opened, so a
+    request can never create a database. Opening a shard constructs an
+    SQLiteDatabase, which applies pending migrations to that file. The
+    default clinic keeps the original database path so existing
+    single-clinic installs need no data move.
+    """
+
+    def __init__(
+        self,
+        directory: str = CLINIC_DB_DIR,
+        default_path: str = DATABASE_PATH,
+        max_open: int = MAX_OPEN_SHARDS,
+        factory: Callable[[str], SQLiteDatabase] = SQLiteDatabase,
+    ):
+        self.directory = directory
+        self.default_path = default_path
+        self.max_open = max_open
+        self.factory = factory
+        self._shards: "OrderedDict[str, SQLiteDatabase]" = OrderedDict()
+        self._building: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, clinic: str) -> str:
+        if clinic == DEFAULT_CLINIC:
+            return self.default_path
+        if not is_valid_clinic(clinic):
+            raise ValueError(f"Invalid clinic id: {clinic}")
+        return os.path.join(self.directory, f"{clinic}.db")
+
+    def list_clinics(self) -> List[str]:
+        """
+        Every clinic with a database on disk, the default clinic first.
+        """
+        clinics = [DEFAULT_CLINIC]
+        if os.path.isdir(self.directory):
+            clinics += sorted(name[:-3] for name in os.listdir(self.directory) if name.endswith(".db"))
+        return clinics
+
+    def is_provisioned(self, clinic: str) -> bool:
+        if clinic == DEFAULT_CLINIC:
+            return True
+        return is_valid_clinic(clinic) and os.path.exists(self.path_for(clinic))
+
+    def provision(self, clinic: str) -> str:
+        """
+        Create and migrate the database of a new clinic, returning its path.
+        """
+        path = self.path_for(clinic)
+        os.makedirs(self.directory, exist_ok=True)
+        apply_migrations(path)
+        return path
+
+    def get(self, clinic: str) -> SQLiteDatabase:
+        with self._lock:
+            shard = self._shards.get(clinic)
+            if shard is not None:
+                self._shards.move_to_end(clinic)
+                return shard
+            building = self._building.setdefault(clinic, threading.Lock())
+        # Opening runs migrations, so only callers for this clinic wait on it
+        with building:
+            with self._lock:
+                shard = self._shards.get(clinic)
+                if shard is not None:
+                    self._shards.move_to_end(clinic)
+                    return shard
+            try:
+                path = self.path_for(clinic)
+                if not self.is_provisioned(clinic):
+                    raise UnknownClinicError(f"Unknown clinic: {clinic}")
+                shard = self.factory(path)
+            except BaseException:
+                with self._lock:
+                    self._building.pop(clinic, None)
+                raise
+            evicted = []
+            with self._lock:
+                self._shards[clinic] = shard
+                self._building.pop(clinic, None)
+                while len(self._shards) > self.max_open:
+                    evicted.append(self._shards.popitem(last=False)[1])
+        # Closing only drops the cache connection; in-flight calls reopen it
+        for old in evicted:
+            old.close()
+        return shard
+
+    def close_all(self):
+        with self._lock:
+            for shard in self._shards.values():
+                shard.close()
+            self._shards.clear()
+
+
+class TenantDatabase:
+    """
+    Stands in for an SQLiteDatabase and forwards each call to the shard of
+    the clinic handling the current request.
+    """
+
+    def __init__(self, router: ShardRouter):
+        self.router = router
+
+    def has_clinic(self, clinic: str) -> bool:
+        return self.router.is_provisioned(clinic)
+
+    def for_clinic(self, clinic: str) -> SQLiteDatabase:
+        return self.router.get(clinic)
+
+    def __getattr__(self, name: str):
+        return getattr(self.router.get(current_clinic.get()), name)
+
+
+shards = ShardRouter()
+tenant_db = TenantDatabase(shards)
@@ -1,9 +1,29 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from core.audit import audit_log
+from core.backups import run_scheduled_backups
+from core.config import BACKUP_INTERVAL_SECONDS
+from core.startup import warm_up
 from routers import api_router
-from middleware import add_cors_middleware
+from middleware import add_cors_middleware, add_tenant_middleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve liveness straight away; /ready turns green when warm-up is done
+    warming = asyncio.create_task(asyncio.to_thread(warm_up.run))
+    audit_log.start()
+    backups = asyncio.create_task(run_scheduled_backups(BACKUP_INTERVAL_SECONDS)) if BACKUP_INTERVAL_SECONDS else None
+    yield
+    if backups is not None:
+        backups.cancel()
+    await warming
+    # Write out any buffered audit events before the worker exits
+    await audit_log.stop()
 
+app = FastAPI(lifespan=lifespan)
+
+add_tenant_middleware(app)
 add_cors_middleware(app)
 
 app.include_router(api_router)
@@ -0,0 +1,177 @@
+"""
+Management commands for the ClinicKit backend.
+
+Usage:
+    python manage.py add-clinic ID --password PASSWORD
+    python manage.py migrate [--db PATH | --clinic ID | --all-clinics] [--check]
+    python manage.py rebuild-stats [--db PATH | --clinic ID]
+    python manage.py backup [--db PATH | --clinic ID | --all-clinics] [--dest DIR] [--compress] [--no-verify]
+    python manage.py import-profile [--module NAME] [--limit N]
+    python manage.py find-duplicates [--db PATH | --clinic ID] [--min-score SCORE]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from core.config import BACKUP_DIR, DEFAULT_CLINIC, DUPLICATE_MIN_SCORE
+from core.startup import profile_imports
+from db.backup import BackupError, backup_database, snapshot_path
+from db.database import SQLiteDatabase
+from db.migrations import apply_migrations, get_version, latest_version, pending_migrations
+from db.tenancy import is_valid_clinic, shards
+
+
+def resolve_paths(args) -> list:
+    if args.db:
+        return [args.db]
+    if getattr(args, "all_clinics", False):
+        return [shards.path_for(clinic) for clinic in shards.list_clinics()]
+    if not shards.is_provisioned(args.clinic):
+        raise SystemExit(f"Unknown clinic: {args.clinic} (create it with add-clinic)")
+    return [shards.path_for(args.clinic)]
+
+
+def add_clinic(args) -> int:
+    if not is_valid_clinic(args.clinic):
+        print(f"Invalid clinic id: {args.clinic}", file=sys.stderr)
+        return 2
+    if shards.is_provisioned(args.clinic):
+        print(f"Clinic {args.clinic} already exists", file=sys.stderr)
+        return 1
+    db_path = shards.provision(args.clinic)
+    # The migrations seed logins with a well-known password; never leave it usable
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("UPDATE users SET password = ?", (args.password,))
+    finally:
+        conn.close()
+    print(f"{db_path}: clinic {args.clinic} created")
+    return 0
+
+
+def check_migrations(db_path: str) -> int:
+    if not os.path.exists(db_path):
+        print(f"{db_path}: database does not exist", file=sys.stderr)
+        return 2
+    # Read-only so a check never creates or changes the file
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        current = get_version(conn)
+        pending = pending_migrations(conn)
+    finally:
+        conn.close()
+    print(f"{db_path}: schema version {current}, latest {latest_version()}")
+    for version, description, _steps in pending:
+        print(f"  pending {version}: {description}")
+    return 1 if pending else 0
+
+
+def migrate(args) -> int:
+    if args.check:
+        return max(check_migrations(db_path) for db_path in resolve_paths(args))
+    for db_path in resolve_paths(args):
+        conn = sqlite3.connect(db_path)
+        try:
+            current = get_version(conn)
+        finally:
+            conn.close()
+        version = apply_migrations(db_path)
+        print(f"{db_path}: migrated from version {current} to {version}")
+    return 0
+
+
+def rebuild_stats(args) -> int:
+    for db_path in resolve_paths(args):
+        SQLiteDatabase(db_path).rebuild_patient_stats()
+        print(f"{db_path}: dashboard statistics rebuilt")
+    return 0
+
+
+def backup(args) -> int:
+    for db_path in resolve_paths(args):
+        name = os.path.splitext(os.path.basename(db_path))[0]
+        try:
+            dest = backup_database(db_path, snapshot_path(args.dest, name), compress=args.compress, verify=args.verify)
+        except BackupError as error:
+            print(f"{db_path}: {error}", file=sys.stderr)
+            return 1
+        print(f"{db_path}: backed up to {dest}")
+    return 0
+
+
+def find_duplicates(args) -> int:
+    for db_path in resolve_paths(args):
+        database = SQLiteDatabase(db_path)
+        pairs = database.find_duplicate_pairs(args.min_score)
+        print(f"{db_path}: {len(pairs)} likely duplicate pairs")
+        for pair in pairs:
+            first, second = pair["patient_ids"]
+            print(f"  {pair['score']:.3f}  {first} <-> {second}")
+        database.close()
+    return 0
+
+
+def import_profile(args) -> int:
+    rows = profile_imports(args.module, cwd=os.path.dirname(os.path.abspath(__file__)))
+    total = sum(own for _module, own, _cumulative, _depth in rows)
+    print(f"import {args.module}: {total / 1000:.1f} ms across {len(rows)} modules")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module")
+    for module, own, cumulative, _depth in sorted(rows, key=lambda row: row[2], reverse=True)[:args.limit]:
+        print(f"{own / 1000:9.1f} {cumulative / 1000:9.1f}  {module}")
+    return 0
+
+
+def add_database_arguments(parser: argparse.ArgumentParser, all_clinics: bool = False):
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--db", help="database file to use")
+    target.add_argument("--clinic", default=DEFAULT_CLINIC, help="clinic whose database to use")
+    if all_clinics:
+        target.add_argument("--all-clinics", action="store_true", help="every clinic database on disk")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ClinicKit management commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    clinic_parser = commands.add_parser("add-clinic", help="create the database of a new clinic")
+    clinic_parser.add_argument("clinic", help="id of the new clinic")
+    clinic_parser.add_argument("--password", required=True, help="password for the clinic's seeded users")
+    clinic_parser.set_defaults(handler=add_clinic)
+
+    migrate_parser = commands.add_parser("migrate", help="check or apply schema migrations")
+    add_database_arguments(migrate_parser, all_clinics=True)
+    migrate_parser.add_argument("--check", action="store_true", help="only report pending migrations")
+    migrate_parser.set_defaults(handler=migrate)
+
+    stats_parser = commands.add_parser("rebuild-stats", help="recompute dashboard counters from scratch")
+    add_database_arguments(stats_parser)
+    stats_parser.set_defaults(handler=rebuild_stats)
+
+    backup_parser = commands.add_parser("backup", help="snapshot live databases without stopping the API")
+    add_database_arguments(backup_parser, all_clinics=True)
+    backup_parser.add_argument("--dest", default=BACKUP_DIR, help="directory for the snapshots")
+    backup_parser.add_argument("--compress", action="store_true", help="gzip the snapshots")
+    backup_parser.add_argument("--no-verify", dest="verify", action="store_false", help="skip the integrity check")
+    backup_parser.set_defaults(handler=backup)
+
+    duplicates_parser = commands.add_parser("find-duplicates", help="list likely duplicate patient charts")
+    add_database_arguments(duplicates_parser)
+    duplicates_parser.add_argument("--min-score", type=float, default=DUPLICATE_MIN_SCORE, help="lowest name similarity to report")
+    duplicates_parser.set_defaults(handler=find_duplicates)
+
+    profile_parser = commands.add_parser("import-profile", help="report the import cost of each module")
+    profile_parser.add_argument("--module", default="main", help="module to import")
+    profile_parser.add_argument("--limit", type=int, default=25, help="number of modules to list")
+    profile_parser.set_defaults(handler=import_profile)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,8 @@
+from fastapi import Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from core.config import CLINIC_COOKIE_NAME, DEFAULT_CLINIC
+from db.tenancy import current_clinic, is_valid_clinic, shards
 
 def add_cors_middleware(app):
     app.add_middleware(
@@ -8,3 +12,33 @@ def add_cors_middleware(app):
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+class TenantMiddleware:
+    """
+    Resolve the clinic from the session cookie so database calls go to its shard.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        clinic = Request(scope).cookies.get(CLINIC_COOKIE_NAME, DEFAULT_CLINIC)
+        if clinic != DEFAULT_CLINIC and not is_valid_clinic(clinic):
+            response = JSONResponse({"detail": "Invalid clinic"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        if not shards.is_provisioned(clinic):
+            response = JSONResponse({"detail": "Unknown clinic"}, status_code=404)
+            await response(scope, receive, send)
+            return
+        token = current_clinic.set(clinic)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_clinic.reset(token)
+
+def add_tenant_middleware(app):
+    app.add_middleware(TenantMiddleware)
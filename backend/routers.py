@@ -5,6 +5,10 @@ from api.users import router as users_router
 from api.permissions import router as permissions_router
 from api.dashboard import router as dashboard_router
 from api.appointments import router as appointments_router  
+from api.events import router as events_router
+from api.audit import router as audit_router
+from api.health import router as health_router
+from api.analytics import router as analytics_router
 
 api_router = APIRouter()
 
@@ -14,3 +18,7 @@ api_router.include_router(users_router, prefix="/users", tags=["users"])
 api_router.include_router(permissions_router, prefix="/permissions", tags=["permissions"])
 api_router.include_router(dashboard_router, prefix="", tags=["dashboard"])
 api_router.include_router(appointments_router, prefix="/appointments", tags=["appointments"])
+api_router.include_router(events_router, prefix="", tags=["events"])
+api_router.include_router(audit_router, prefix="/audit", tags=["audit"])
+api_router.include_router(health_router, prefix="", tags=["health"])
+api_router.include_router(analytics_router, prefix="/analytics", tags=["analytics"])
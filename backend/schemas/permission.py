@@ -5,4 +5,4 @@ from core.config import MODULES, PERMISSION_LEVELS
 class PermissionsSchema(BaseModel):
     patient_mgmt: Literal["None", "View", "Edit"]
     user_mgmt: Literal["None", "View", "Edit"]
-    pharmacy: Literal["None", "View", "Edit"]
+    appointments: Literal["None", "View", "Edit"]
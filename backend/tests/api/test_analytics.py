@@ -0,0 +1,58 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from fastapi import FastAPI
+from core.permissions import compile_permissions
+from api.analytics import router as analytics_router
+
+class TestAnalyticsAPI(unittest.TestCase):
+    def setUp(self):
+        # Create a test FastAPI app and mount the router
+        self.app = FastAPI()
+        self.app.include_router(analytics_router, prefix="")
+        self.client = TestClient(self.app)
+        
+        self.security_patcher = patch("core.security.get_current_user")
+        self.mock_security = self.security_patcher.start()
+        
+        self.report_patcher = patch("api.analytics.build_report")
+        self.mock_report = self.report_patcher.start()
+        self.mock_report.return_value = {"patients": 3}
+    
+    def tearDown(self):
+        self.security_patcher.stop()
+        self.report_patcher.stop()
+    
+    def test_admin_gets_report(self):
+        """Test that user administrators can read population analytics"""
+        self.mock_security.return_value = {"username": "admin", "permission_mask": compile_permissions({"user_mgmt": "Edit"})}
+        
+        response = self.client.get("/")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"patients": 3})
+        self.assertEqual(self.mock_report.call_args[0][0], "default")
+    
+    def test_other_users_are_refused(self):
+        """Test that clinicians without user management cannot read analytics"""
+        self.mock_security.return_value = {"username": "doc", "permission_mask": compile_permissions({"patient_mgmt": "Edit"})}
+        
+        response = self.client.get("/")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 403)
+        self.mock_report.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
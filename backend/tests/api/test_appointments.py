@@ -4,6 +4,7 @@ from fastapi.testclient import TestClient
 from fastapi import FastAPI
 from api.appointments import router as appointments_router
 from api.appointments import appointments as mock_appointments_db
+from api.appointments import recurring_appointments
 
 class TestAppointmentsAPI(unittest.TestCase):
     def setUp(self):
@@ -146,5 +147,83 @@ class TestAppointmentsAPI(unittest.TestCase):
         # Verify mock database wasn't changed
         self.assertEqual(len(mock_appointments_db), 2)
 
+class TestRecurringAppointmentsAPI(unittest.TestCase):
+    def setUp(self):
+        # Create a test FastAPI app and mount the router
+        self.app = FastAPI()
+        self.app.include_router(appointments_router, prefix="")
+        self.client = TestClient(self.app)
+        
+        self.original_appointments = mock_appointments_db.copy()
+        mock_appointments_db.clear()
+        mock_appointments_db.append({
+            "id": 1,
+            "patient_name": "Test Patient",
+            "date": "2024-01-09",
+            "time": "10:00",
+            "reason": "Test Reason",
+            "status": "Scheduled"
+        })
+        recurring_appointments.clear()
+    
+    def tearDown(self):
+        mock_appointments_db.clear()
+        mock_appointments_db.extend(self.original_appointments)
+        recurring_appointments.clear()
+    
+    def create_weekly_series(self, **overrides):
+        rule = {
+            "patient_name": "Weekly Patient",
+            "start_date": "2024-01-01",
+            "time": "09:00",
+            "reason": "Physiotherapy",
+            "frequency": "WEEKLY",
+        }
+        rule.update(overrides)
+        return self.client.post("/recurring", json=rule)
+    
+    def test_create_series_stores_one_record(self):
+        """Test that a series is stored once, not per occurrence"""
+        response = self.create_weekly_series(count=10)
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["series"]["id"], 1)
+        self.assertEqual(len(recurring_appointments), 1)
+        self.assertEqual(len(mock_appointments_db), 1)
+    
+    def test_calendar_expands_only_the_window(self):
+        """Test that the calendar mixes one-offs with occurrences in the window"""
+        self.create_weekly_series()
+        
+        response = self.client.get("/calendar?start=2024-01-08&end=2024-01-21")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        appointments = response.json()["appointments"]
+        self.assertEqual([(appt["date"], appt["id"]) for appt in appointments], [
+            ("2024-01-08", "1:2024-01-08"),
+            ("2024-01-09", 1),
+            ("2024-01-15", "1:2024-01-15"),
+        ])
+    
+    def test_skip_occurrence(self):
+        """Test cancelling one occurrence of a series"""
+        self.create_weekly_series()
+        
+        response = self.client.post("/recurring/1/skip", json={"date": "2024-01-08"})
+        calendar = self.client.get("/calendar?start=2024-01-08&end=2024-01-15").json()
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([appt["date"] for appt in calendar["appointments"]], ["2024-01-09", "2024-01-15"])
+    
+    def test_invalid_series_and_window(self):
+        """Test validation of rules and calendar windows"""
+        self.assertEqual(self.create_weekly_series(count=3, until="2024-02-01").status_code, 400)
+        self.assertEqual(self.create_weekly_series(frequency="HOURLY").status_code, 422)
+        self.assertEqual(self.client.get("/calendar?start=2024-01-01&end=2026-01-01").status_code, 400)
+        self.assertEqual(self.client.post("/recurring/99/skip", json={"date": "2024-01-08"}).status_code, 404)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,159 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import asyncio
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch, AsyncMock
+from fastapi.testclient import TestClient
+from fastapi import FastAPI
+from core.audit import AuditLog
+from core.permissions import compile_permissions
+from api.audit import router as audit_router
+
+class TestAuditLog(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "audit.db")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def stored_count(self):
+        if not os.path.exists(self.db_path):
+            return 0
+        conn = sqlite3.connect(self.db_path)
+        try:
+            # The background flush may have created the file but not the table yet
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'audit_log'").fetchone():
+                return 0
+            return conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        finally:
+            conn.close()
+    
+    async def test_events_are_buffered_until_flush(self):
+        """Test that recording does not write until a flush"""
+        audit = AuditLog(self.db_path, batch_size=10, max_buffer=100)
+        await audit.record("patient.view", "doc", patient_id=1)
+        await audit.record("patient.update", "admin", patient_id=1)
+        self.assertEqual(self.stored_count(), 0)
+        
+        await audit.flush()
+        
+        # Assertions
+        self.assertEqual(self.stored_count(), 2)
+    
+    async def test_full_buffer_applies_backpressure(self):
+        """Test that a full buffer is written before record returns"""
+        audit = AuditLog(self.db_path, batch_size=2, max_buffer=3)
+        for patient_id in range(3):
+            await audit.record("patient.view", "doc", patient_id=patient_id)
+        
+        # Assertions
+        self.assertEqual(self.stored_count(), 3)
+    
+    async def test_unwritable_log_never_fails_requests(self):
+        """Test that a broken audit database drops the oldest events instead of raising"""
+        audit = AuditLog(os.path.join(self.tmpdir.name, "missing", "audit.db"), batch_size=2, max_buffer=3)
+        with self.assertLogs("core.audit", level="ERROR"):
+            for patient_id in range(6):
+                await audit.record("patient.view", "doc", patient_id=patient_id)
+        
+        # Assertions
+        self.assertEqual(len(audit._buffer), 3)
+        self.assertEqual([event["patient_id"] for event in audit._buffer], [3, 4, 5])
+        self.assertEqual(audit.dropped, 3)
+    
+    async def test_background_task_flushes_and_stop_drains(self):
+        """Test the periodic flush and the flush on shutdown"""
+        audit = AuditLog(self.db_path, batch_size=2, flush_seconds=60, max_buffer=100)
+        audit.start()
+        await audit.record("patient.view", "doc", patient_id=1)
+        await audit.record("patient.view", "doc", patient_id=2)
+        for _ in range(50):
+            if self.stored_count() == 2:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.stored_count(), 2)
+        
+        await audit.record("patient.view", "doc", patient_id=3)
+        await audit.stop()
+        
+        # Assertions
+        self.assertEqual(self.stored_count(), 3)
+    
+    async def test_query_by_time_range_and_patient(self):
+        """Test filtering stored events"""
+        audit = AuditLog(self.db_path)
+        await audit.record("patient.view", "doc", patient_id=1)
+        await audit.record("patient.view", "admin", patient_id=2)
+        
+        events = await audit.query(start="2000-01-01", end="9999-01-01", patient_id=2)
+        
+        # Assertions
+        self.assertEqual([(event["username"], event["patient_id"]) for event in events], [("admin", 2)])
+        self.assertEqual(events[0]["clinic"], "default")
+        self.assertEqual(await audit.query(end="2000-01-01"), [])
+    
+    async def test_rows_are_append_only(self):
+        """Test that stored events cannot be changed"""
+        audit = AuditLog(self.db_path)
+        await audit.record("patient.view", "doc", patient_id=1)
+        await audit.flush()
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with self.assertRaises(sqlite3.IntegrityError):
+                conn.execute("DELETE FROM audit_log")
+        finally:
+            conn.close()
+
+class TestAuditAPI(unittest.TestCase):
+    def setUp(self):
+        # Create a test FastAPI app and mount the router
+        self.app = FastAPI()
+        self.app.include_router(audit_router, prefix="")
+        self.client = TestClient(self.app)
+        
+        self.security_patcher = patch("core.security.get_current_user")
+        self.mock_security = self.security_patcher.start()
+        
+        self.audit_patcher = patch("api.audit.audit_log")
+        self.mock_audit = self.audit_patcher.start()
+        self.mock_audit.query = AsyncMock(return_value=[{"id": 1, "action": "patient.view"}])
+    
+    def tearDown(self):
+        self.security_patcher.stop()
+        self.audit_patcher.stop()
+    
+    def test_admin_can_query(self):
+        """Test querying the audit log as admin"""
+        self.mock_security.return_value = {"username": "admin", "permission_mask": compile_permissions({"user_mgmt": "Edit"})}
+        
+        response = self.client.get("/?start=2024-01-01&patient_id=4")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"events": [{"id": 1, "action": "patient.view"}]})
+        self.mock_audit.query.assert_awaited_once_with(start="2024-01-01", end=None, username=None, patient_id=4, limit=100)
+    
+    def test_non_admin_is_refused(self):
+        """Test that other users cannot read the audit log"""
+        self.mock_security.return_value = {"username": "doc", "permission_mask": compile_permissions({"user_mgmt": "None"})}
+        
+        response = self.client.get("/")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 403)
+        self.mock_audit.query.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
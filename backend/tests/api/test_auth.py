@@ -0,0 +1,94 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import unittest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from fastapi import FastAPI
+from api.auth import router as auth_router
+from middleware import add_tenant_middleware
+
+class TestAuthAPI(unittest.TestCase):
+    def setUp(self):
+        # Create a test FastAPI app with tenant routing and mount the router
+        self.app = FastAPI()
+        add_tenant_middleware(self.app)
+        self.app.include_router(auth_router, prefix="")
+        self.client = TestClient(self.app, base_url="https://testserver")
+        
+        self.db_patcher = patch("api.auth.db")
+        self.mock_db = self.db_patcher.start()
+        # tests.mocks sets MagicMock.return_value globally, so give the shard its own mock
+        self.shard = MagicMock()
+        self.mock_db.for_clinic.return_value = self.shard
+        self.shard.get_user.return_value = {"username": "doc", "password": "password", "permissions": {}}
+    
+    def tearDown(self):
+        self.db_patcher.stop()
+    
+    def test_login_with_clinic(self):
+        """Test that login checks the clinic's own database and remembers the clinic"""
+        response = self.client.post("/login", data={"username": "doc", "password": "password", "clinic": "north"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.cookies["clinic"], "north")
+        self.mock_db.for_clinic.assert_called_once_with("north")
+        self.shard.get_user.assert_called_once_with("doc")
+    
+    def test_login_defaults_to_default_clinic(self):
+        """Test that existing clients without a clinic keep working"""
+        response = self.client.post("/login", data={"username": "doc", "password": "password"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.mock_db.for_clinic.assert_called_once_with("default")
+    
+    def test_login_invalid_clinic(self):
+        """Test that a malformed clinic id is rejected"""
+        response = self.client.post("/login", data={"username": "doc", "password": "password", "clinic": "../x"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 400)
+        self.mock_db.for_clinic.assert_not_called()
+    
+    def test_login_unknown_clinic(self):
+        """Test that logging in to a clinic that was never provisioned fails"""
+        self.mock_db.has_clinic.return_value = False
+        
+        response = self.client.post("/login", data={"username": "doc", "password": "password", "clinic": "nowhere"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 404)
+        self.mock_db.for_clinic.assert_not_called()
+    
+    def test_unknown_clinic_cookie_is_rejected(self):
+        """Test that the middleware refuses a clinic that was never provisioned"""
+        self.client.cookies.set("clinic", "nowhere")
+        
+        with patch("middleware.shards.is_provisioned", lambda clinic: False):
+            response = self.client.get("/me")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"detail": "Unknown clinic"})
+    
+    def test_invalid_clinic_cookie_is_rejected(self):
+        """Test that the middleware refuses a tampered clinic cookie"""
+        self.client.cookies.set("clinic", "../x")
+        
+        response = self.client.get("/me")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Invalid clinic"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import unittest
+from datetime import date
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from fastapi import FastAPI
+from api.dashboard import router as dashboard_router
+from db.stats import appointment_counts
+from api.appointments import appointments
+
+class TestDashboardAPI(unittest.TestCase):
+    def setUp(self):
+        # Create a test FastAPI app and mount the router
+        self.app = FastAPI()
+        self.app.include_router(dashboard_router, prefix="")
+        self.client = TestClient(self.app)
+        
+        self.db_patcher = patch("api.dashboard.db")
+        self.mock_db = self.db_patcher.start()
+        self.mock_db.list_modules.return_value = {
+            "patient_mgmt": {"href": "/patients", "title": "Patient Management", "description": "Patients", "icon": "Users"},
+            "appointments": {"href": "/appointments", "title": "Appointments", "description": "Appointments", "icon": "Calendar"},
+        }
+        self.mock_db.get_patient_stats.return_value = {"total": 12, "overdue": 3}
+        
+        self.security_patcher = patch("api.dashboard.get_current_user")
+        self.mock_security = self.security_patcher.start()
+        
+        # Seed today's appointment counters
+        today = date.today().isoformat()
+        appointment_counts.rebuild([
+            {"id": 1, "patient_name": "A", "date": today, "time": "09:00", "reason": "Checkup", "status": "Scheduled"},
+            {"id": 2, "patient_name": "B", "date": today, "time": "10:00", "reason": "Checkup", "status": "Scheduled"},
+            {"id": 3, "patient_name": "C", "date": today, "time": "11:00", "reason": "Checkup", "status": "Missed"},
+        ])
+    
+    def tearDown(self):
+        self.db_patcher.stop()
+        self.security_patcher.stop()
+        appointment_counts.rebuild(appointments)
+    
+    def test_dashboard_stats_for_permitted_modules(self):
+        """Test that cards and live figures follow the user's permissions"""
+        self.mock_security.return_value = {
+            "username": "admin",
+            "permissions": {"patient_mgmt": "Edit", "user_mgmt": "Edit", "appointments": "View"},
+        }
+        
+        response = self.client.get("/dashboard")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([card["id"] for card in body["cards"]], ["patient_mgmt", "appointments"])
+        self.assertEqual(body["stats"]["patients"], {"total": 12, "overdue": 3})
+        self.assertEqual(body["stats"]["appointments_today"], {"Scheduled": 2, "Missed": 1})
+    
+    def test_recurring_occurrences_count_toward_today(self):
+        """Test that today's figures match the calendar, recurring series included"""
+        self.mock_security.return_value = {"username": "doc", "permissions": {"appointments": "View"}}
+        today = date.today()
+        series = [
+            {"id": 1, "patient_name": "D", "start_date": today.isoformat(), "time": "14:00", "reason": "Therapy",
+             "frequency": "WEEKLY", "interval": 1, "until": None, "count": None, "exdates": []},
+            {"id": 2, "patient_name": "E", "start_date": today.isoformat(), "time": "15:00", "reason": "Therapy",
+             "frequency": "DAILY", "interval": 1, "until": None, "count": None, "exdates": [today.isoformat()]},
+        ]
+        
+        with patch("api.appointments.recurring_appointments", series):
+            response = self.client.get("/dashboard")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["stats"]["appointments_today"], {"Scheduled": 3, "Missed": 1})
+    
+    def test_dashboard_hides_stats_without_permission(self):
+        """Test that no figures are returned for modules the user cannot see"""
+        self.mock_security.return_value = {
+            "username": "doc",
+            "permissions": {"patient_mgmt": "None", "user_mgmt": "None", "appointments": "None"},
+        }
+        
+        response = self.client.get("/dashboard")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"cards": [], "stats": {}})
+        self.mock_db.get_patient_stats.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import asyncio
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from fastapi import FastAPI, HTTPException
+from core.events import Broadcaster
+from api.events import format_event, router as events_router
+
+class TestBroadcaster(unittest.IsolatedAsyncioTestCase):
+    async def test_live_events_are_delivered(self):
+        """Test that a subscriber receives events published after it connected"""
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe()
+        pending = asyncio.ensure_future(subscription.__anext__())
+        await asyncio.sleep(0)  # let the subscriber register
+        broadcaster.publish("patient.created", {"id": 1})
+        
+        event = await pending
+        
+        # Assertions
+        self.assertEqual(event, {"id": 1, "type": "patient.created", "data": {"id": 1}, "clinic": None})
+        await subscription.aclose()
+    
+    async def test_resume_from_last_event_id(self):
+        """Test that a reconnecting client gets the events it missed"""
+        broadcaster = Broadcaster()
+        for patient_id in range(1, 4):
+            broadcaster.publish("patient.updated", {"id": patient_id})
+        
+        subscription = broadcaster.subscribe(last_event_id=1)
+        events = [await subscription.__anext__(), await subscription.__anext__()]
+        
+        # Assertions
+        self.assertEqual([event["id"] for event in events], [2, 3])
+        await subscription.aclose()
+    
+    async def test_resume_past_history_sends_reset(self):
+        """Test that a client too far behind is told to refetch"""
+        broadcaster = Broadcaster(history_size=2)
+        for patient_id in range(1, 5):
+            broadcaster.publish("patient.updated", {"id": patient_id})
+        
+        subscription = broadcaster.subscribe(last_event_id=1)
+        event = await subscription.__anext__()
+        
+        # Assertions
+        self.assertEqual(event["type"], "reset")
+        self.assertEqual(event["id"], 2)
+        self.assertEqual((await subscription.__anext__())["id"], 3)
+        await subscription.aclose()
+    
+    async def test_slow_subscriber_is_disconnected(self):
+        """Test that a full per-client buffer ends the stream"""
+        broadcaster = Broadcaster(buffer_size=2)
+        subscription = broadcaster.subscribe()
+        pending = asyncio.ensure_future(subscription.__anext__())
+        await asyncio.sleep(0)  # let the subscriber register
+        for patient_id in range(1, 5):
+            broadcaster.publish("patient.updated", {"id": patient_id})
+        
+        received = [await pending]
+        async for event in subscription:
+            received.append(event)
+        
+        # Assertions
+        self.assertEqual([event["id"] for event in received], [1, 2])
+    
+    async def test_events_are_scoped_to_clinic(self):
+        """Test that a subscriber only sees its own clinic's changes"""
+        broadcaster = Broadcaster()
+        broadcaster.publish("patient.created", {"id": 1}, clinic="north")
+        broadcaster.publish("patient.created", {"id": 2}, clinic="south")
+        subscription = broadcaster.subscribe(last_event_id=0, clinic="south")
+        pending = asyncio.ensure_future(subscription.__anext__())
+        
+        event = await pending
+        
+        # Assertions
+        self.assertEqual(event["data"], {"id": 2})
+        await subscription.aclose()
+    
+    def test_format_event(self):
+        """Test the server-sent events wire format"""
+        event = {"id": 7, "type": "appointment.created", "data": {"id": 3}}
+        self.assertEqual(format_event(event), 'id: 7\nevent: appointment.created\ndata: {"id": 3}\n\n')
+
+class FiniteBroadcaster:
+    """Replays a fixed list of events and then ends the stream."""
+
+    def __init__(self, events):
+        self.events = events
+        self.last_event_id = None
+
+    async def subscribe(self, last_event_id=None, heartbeat=None, clinic=None):
+        self.last_event_id = last_event_id
+        self.clinic = clinic
+        for event in self.events:
+            yield event
+
+class TestEventsAPI(unittest.TestCase):
+    def setUp(self):
+        # Create a test FastAPI app and mount the router
+        self.app = FastAPI()
+        self.app.include_router(events_router, prefix="")
+        self.client = TestClient(self.app)
+        
+        self.security_patcher = patch("api.events.get_current_user")
+        self.mock_security = self.security_patcher.start()
+        self.mock_security.return_value = {"username": "doc", "permissions": {}}
+        
+        self.broadcaster = FiniteBroadcaster([
+            {"id": 4, "type": "patient.updated", "data": {"id": 1}},
+            None,
+            {"id": 5, "type": "appointment.created", "data": {"id": 2}},
+        ])
+        self.broadcaster_patcher = patch("api.events.broadcaster", self.broadcaster)
+        self.broadcaster_patcher.start()
+    
+    def tearDown(self):
+        self.security_patcher.stop()
+        self.broadcaster_patcher.stop()
+    
+    def test_events_require_authentication(self):
+        """Test that the stream is refused without a session"""
+        self.mock_security.side_effect = HTTPException(401, "Not authenticated")
+        
+        response = self.client.get("/events")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"detail": "Not authenticated"})
+    
+    def test_events_stream_framing(self):
+        """Test the content type, heartbeat and resume header handling"""
+        response = self.client.get("/events", headers={"Last-Event-ID": "3"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        self.assertEqual(response.headers["cache-control"], "no-cache")
+        self.assertEqual(response.text, (
+            'id: 4\nevent: patient.updated\ndata: {"id": 1}\n\n'
+            ': keep-alive\n\n'
+            'id: 5\nevent: appointment.created\ndata: {"id": 2}\n\n'
+        ))
+        self.assertEqual(self.broadcaster.last_event_id, 3)
+        self.assertEqual(self.broadcaster.clinic, "default")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from fastapi import FastAPI
+from core.startup import WarmUp
+from api.health import router as health_router
+
+class TestHealthAPI(unittest.TestCase):
+    def setUp(self):
+        self.app = FastAPI()
+        self.app.include_router(health_router)
+        self.client = TestClient(self.app)
+        
+        self.warm_up = WarmUp([])
+        self.warm_up_patcher = patch("api.health.warm_up", self.warm_up)
+        self.warm_up_patcher.start()
+    
+    def tearDown(self):
+        self.warm_up_patcher.stop()
+    
+    def test_not_ready_before_warm_up(self):
+        """Test that readiness fails until warm-up has run"""
+        response = self.client.get("/ready")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "starting"})
+        self.assertEqual(self.client.get("/live").status_code, 200)
+    
+    def test_ready_after_warm_up(self):
+        """Test that readiness passes once warm-up is done"""
+        self.warm_up.run()
+        
+        response = self.client.get("/ready")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "ready")
+
+if __name__ == "__main__":
+    unittest.main()
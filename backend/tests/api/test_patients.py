@@ -16,6 +16,7 @@ from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
 from api.patients import router as patients_router
+from core.permissions import compile_permissions
 
 class TestPatientRegistration(unittest.TestCase):
     def setUp(self):
@@ -29,11 +30,15 @@ class TestPatientRegistration(unittest.TestCase):
         self.mock_db = self.db_patcher.start()
         
         # Create a mock for the security functions
-        self.security_patcher = patch("api.patients.get_current_user")
+        self.security_patcher = patch("core.security.get_current_user")
         self.mock_security = self.security_patcher.start()
         
         # Mock authenticated user
-        self.mock_security.return_value = {"username": "testuser", "permissions": {"patient_mgmt": "Edit"}}
+        self.mock_security.return_value = {
+            "username": "testuser",
+            "permissions": {"patient_mgmt": "Edit"},
+            "permission_mask": compile_permissions({"patient_mgmt": "Edit"}),
+        }
     
     def tearDown(self):
         self.db_patcher.stop()
@@ -81,7 +86,7 @@ class TestPatientRegistration(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), mock_patient)
         self.mock_security.assert_called_once()
-        self.mock_db.get_patient.assert_called_once_with(patient_id)
+        self.mock_db.get_patient.assert_called_once_with(patient_id, fields=None)
     
     def test_get_patient_detail_not_found(self):
         """Test retrieval of a non-existent patient"""
@@ -95,7 +100,77 @@ class TestPatientRegistration(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.json(), {"detail": "Patient not found"})
         self.mock_security.assert_called_once()
-        self.mock_db.get_patient.assert_called_once_with(patient_id)
+        self.mock_db.get_patient.assert_called_once_with(patient_id, fields=None)
+    
+    def test_get_patient_detail_sparse_fields(self):
+        """Test retrieval of a specific patient restricted to requested fields"""
+        patient_id = 1
+        mock_patient = {"id": patient_id, "name": "John Smith", "last_visit": "2023-01-15"}
+        self.mock_db.get_patient.return_value = mock_patient
+        
+        # Make request
+        response = self.client.get(f"/{patient_id}?fields=name, last_visit")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), mock_patient)
+        self.mock_db.get_patient.assert_called_once_with(patient_id, fields=["name", "last_visit"])
+    
+    def test_get_patients_invalid_field(self):
+        """Test that fields outside the whitelist are rejected"""
+        # Make request
+        response = self.client.get("/?fields=name,password")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Invalid field: password"})
+        self.mock_db.list_patients_summary.assert_not_called()
+    
+    def test_get_patients_batch(self):
+        """Test fetching several patients in one request"""
+        self.mock_db.get_patients.return_value = {
+            1: {"id": 1, "name": "John Smith"},
+            3: {"id": 3, "name": "Jane Doe"},
+        }
+        
+        # Make request
+        response = self.client.get("/batch?ids=1,2,3,1&fields=name")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "patients": {"1": {"id": 1, "name": "John Smith"}, "3": {"id": 3, "name": "Jane Doe"}},
+            "missing": [2],
+        })
+        self.mock_db.get_patients.assert_called_once_with([1, 2, 3], fields=["name"])
+    
+    def test_get_patients_batch_limit(self):
+        """Test that oversized and malformed batches are rejected"""
+        too_many = ",".join(str(i) for i in range(1, 102))
+        
+        # Assertions
+        self.assertEqual(self.client.get(f"/batch?ids={too_many}").status_code, 400)
+        self.assertEqual(self.client.get("/batch?ids=1,abc").status_code, 400)
+        self.mock_db.get_patients.assert_not_called()
+    
+    def test_get_patient_changes(self):
+        """Test delta sync from a cursor"""
+        changes = {"patients": [{"id": 2, "name": "Jane Doe"}], "deleted": [5], "cursor": 42, "has_more": False}
+        self.mock_db.list_patient_changes.return_value = changes
+        
+        # Make request
+        response = self.client.get("/changes?since=40&limit=10")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), changes)
+        self.mock_db.list_patient_changes.assert_called_once_with(40, 10)
+    
+    def test_get_patient_changes_invalid_cursor(self):
+        """Test that negative cursors and oversized pages are rejected"""
+        self.assertEqual(self.client.get("/changes?since=-1").status_code, 400)
+        self.assertEqual(self.client.get("/changes?limit=100000").status_code, 400)
+        self.mock_db.list_patient_changes.assert_not_called()
     
     def test_create_patient_success(self):
         """Test successful creation of a new patient"""
@@ -112,6 +187,7 @@ class TestPatientRegistration(unittest.TestCase):
         }
         created_patient = {**new_patient_data, "id": 3}
         self.mock_db.create_patient.return_value = created_patient
+        self.mock_db.find_duplicate_candidates.return_value = []
         
         # Make request
         response = self.client.post("/new", json=new_patient_data)
@@ -121,6 +197,51 @@ class TestPatientRegistration(unittest.TestCase):
         self.assertEqual(response.json(), created_patient)
         self.mock_security.assert_called_once()
         self.mock_db.create_patient.assert_called_once_with(new_patient_data)
+        self.mock_db.find_duplicate_candidates.assert_called_once_with("New Patient", "2000-03-15", exclude_id=3)
+    
+    def test_create_patient_reports_possible_duplicates(self):
+        """Test that likely existing charts come back with the created patient"""
+        new_patient_data = {"name": "Jon Smith", "date_of_birth": "1990-01-01"}
+        self.mock_db.create_patient.return_value = {**new_patient_data, "id": 3}
+        match = {"score": 0.947, "patient": {"id": 1, "name": "John Smith", "date_of_birth": "1990-01-01"}}
+        self.mock_db.find_duplicate_candidates.return_value = [match]
+        
+        # Make request
+        response = self.client.post("/new", json=new_patient_data)
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {**new_patient_data, "id": 3, "possible_duplicates": [match]})
+    
+    def test_check_duplicates(self):
+        """Test the intake duplicate check"""
+        match = {"score": 0.947, "patient": {"id": 1, "name": "John Smith", "date_of_birth": "1990-01-01"}}
+        self.mock_db.find_duplicate_candidates.return_value = [match]
+        
+        # Make request
+        response = self.client.post("/duplicates/check", json={"name": "Jon Smith", "date_of_birth": "1990-01-01"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"candidates": [match]})
+        self.mock_db.find_duplicate_candidates.assert_called_once_with("Jon Smith", "1990-01-01", exclude_id=None)
+        self.assertEqual(self.client.post("/duplicates/check", json={"name": "Jon Smith"}).status_code, 400)
+    
+    def test_create_patient_requires_edit(self):
+        """Test that a user with view access cannot create patients"""
+        self.mock_security.return_value = {
+            "username": "doc",
+            "permissions": {"patient_mgmt": "View"},
+            "permission_mask": compile_permissions({"patient_mgmt": "View"}),
+        }
+        
+        # Make request
+        response = self.client.post("/new", json={"name": "New Patient"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {"detail": "Edit access to patient_mgmt required"})
+        self.mock_db.create_patient.assert_not_called()
     
     def test_update_patient_success(self):
         """Test successful update of an existing patient"""
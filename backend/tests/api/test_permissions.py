@@ -9,12 +9,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 from tests.mocks import mock_db
 
 
-from api.permissions import router as permissions_router
 import unittest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from fastapi import FastAPI, HTTPException
 from api.permissions import router as permissions_router
+from core.permissions import compile_permissions
+
+ADMIN = {"username": "admin", "permission_mask": compile_permissions({"user_mgmt": "Edit"})}
+REGULAR_USER = {"username": "regularuser", "permission_mask": compile_permissions({"user_mgmt": "View"})}
 
 class TestPermissionsAPI(unittest.TestCase):
     def setUp(self):
@@ -27,11 +30,11 @@ class TestPermissionsAPI(unittest.TestCase):
         self.db_patcher = patch("api.permissions.db")
         self.mock_db = self.db_patcher.start()
         
-        self.security_patcher = patch("api.permissions.get_current_user")
+        self.security_patcher = patch("core.security.get_current_user")
         self.mock_security = self.security_patcher.start()
         
         # Mock module constants from config
-        self.modules_patcher = patch("api.permissions.MODULES", ["patient_mgmt", "user_mgmt", "pharmacy"])
+        self.modules_patcher = patch("api.permissions.MODULES", ["patient_mgmt", "user_mgmt", "appointments"])
         self.mock_modules = self.modules_patcher.start()
         
         self.levels_patcher = patch("api.permissions.PERMISSION_LEVELS", ["None", "View", "Edit"])
@@ -50,14 +53,14 @@ class TestPermissionsAPI(unittest.TestCase):
         # Assertions
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.json(), {
-            "modules": ["patient_mgmt", "user_mgmt", "pharmacy"],
+            "modules": ["patient_mgmt", "user_mgmt", "appointments"],
             "levels": ["None", "View", "Edit"]
         })
     
     def test_update_permissions_as_admin(self):
         """Test updating permissions as an admin user"""
         # Setup admin user
-        self.mock_security.return_value = {"username": "admin"}
+        self.mock_security.return_value = ADMIN
         
         # Setup target user
         target_username = "testuser"
@@ -66,7 +69,7 @@ class TestPermissionsAPI(unittest.TestCase):
             "permissions": {
                 "patient_mgmt": "View",
                 "user_mgmt": "None",
-                "pharmacy": "None"
+                "appointments": "None"
             }
         }
         
@@ -77,7 +80,7 @@ class TestPermissionsAPI(unittest.TestCase):
         new_permissions = {
             "patient_mgmt": "Edit",
             "user_mgmt": "View",
-            "pharmacy": "None"
+            "appointments": "None"
         }
         
         # Make request
@@ -96,13 +99,13 @@ class TestPermissionsAPI(unittest.TestCase):
     def test_update_permissions_not_admin(self):
         """Test updating permissions as a non-admin user (should fail)"""
         # Setup non-admin user
-        self.mock_security.return_value = {"username": "regularuser"}
+        self.mock_security.return_value = REGULAR_USER
         
         # New permissions to apply
         new_permissions = {
             "patient_mgmt": "Edit",
             "user_mgmt": "View",
-            "pharmacy": "None"
+            "appointments": "None"
         }
         
         # Make request
@@ -110,7 +113,7 @@ class TestPermissionsAPI(unittest.TestCase):
         
         # Assertions
         self.assertEqual(response.status_code, 403)
-        self.assertEqual(response.json(), {"detail": "Admin access required"})
+        self.assertEqual(response.json(), {"detail": "Edit access to user_mgmt required"})
         self.mock_security.assert_called_once()
         self.mock_db.get_user.assert_not_called()
         self.mock_db.update_user_permissions.assert_not_called()
@@ -118,7 +121,7 @@ class TestPermissionsAPI(unittest.TestCase):
     def test_update_permissions_user_not_found(self):
         """Test updating permissions for a non-existent user"""
         # Setup admin user
-        self.mock_security.return_value = {"username": "admin"}
+        self.mock_security.return_value = ADMIN
         
         # Setup target user not found
         target_username = "nonexistentuser"
@@ -128,7 +131,7 @@ class TestPermissionsAPI(unittest.TestCase):
         new_permissions = {
             "patient_mgmt": "Edit",
             "user_mgmt": "View",
-            "pharmacy": "None"
+            "appointments": "None"
         }
         
         # Make request
@@ -144,7 +147,7 @@ class TestPermissionsAPI(unittest.TestCase):
     def test_update_permissions_invalid_module(self):
         """Test updating permissions with an invalid module name"""
         # Setup admin user
-        self.mock_security.return_value = {"username": "admin"}
+        self.mock_security.return_value = ADMIN
         
         # Setup target user
         target_username = "testuser"
@@ -153,7 +156,7 @@ class TestPermissionsAPI(unittest.TestCase):
             "permissions": {
                 "patient_mgmt": "View",
                 "user_mgmt": "None",
-                "pharmacy": "None"
+                "appointments": "None"
             }
         }
         
@@ -161,7 +164,7 @@ class TestPermissionsAPI(unittest.TestCase):
         invalid_permissions = {
             "patient_mgmt": "Edit",
             "invalid_module": "View",
-            "pharmacy": "None"
+            "appointments": "None"
         }
         
         # Make request
@@ -177,7 +180,7 @@ class TestPermissionsAPI(unittest.TestCase):
     def test_update_permissions_invalid_level(self):
         """Test updating permissions with an invalid permission level"""
         # Setup admin user
-        self.mock_security.return_value = {"username": "admin"}
+        self.mock_security.return_value = ADMIN
         
         # Setup target user
         target_username = "testuser"
@@ -186,7 +189,7 @@ class TestPermissionsAPI(unittest.TestCase):
             "permissions": {
                 "patient_mgmt": "View",
                 "user_mgmt": "None",
-                "pharmacy": "None"
+                "appointments": "None"
             }
         }
         
@@ -194,7 +197,7 @@ class TestPermissionsAPI(unittest.TestCase):
         invalid_permissions = {
             "patient_mgmt": "Edit",
             "user_mgmt": "SuperAdmin",
-            "pharmacy": "None"
+            "appointments": "None"
         }
         
         # Make request
@@ -210,7 +213,7 @@ class TestPermissionsAPI(unittest.TestCase):
     def test_update_permissions_db_failure(self):
         """Test handling of database failure during permission update"""
         # Setup admin user
-        self.mock_security.return_value = {"username": "admin"}
+        self.mock_security.return_value = ADMIN
         
         # Setup target user
         target_username = "testuser"
@@ -219,7 +222,7 @@ class TestPermissionsAPI(unittest.TestCase):
             "permissions": {
                 "patient_mgmt": "View",
                 "user_mgmt": "None",
-                "pharmacy": "None"
+                "appointments": "None"
             }
         }
         
@@ -230,7 +233,7 @@ class TestPermissionsAPI(unittest.TestCase):
         new_permissions = {
             "patient_mgmt": "Edit",
             "user_mgmt": "View",
-            "pharmacy": "None"
+            "appointments": "None"
         }
         
         # Make request
@@ -0,0 +1,149 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from api.dashboard import router as dashboard_router
+from api.patients import router as patients_router
+from tests.realdb import RealDatabaseTestCase
+
+class TestPatientQueries(RealDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.patients = [self.make_patient(name=f"Patient {number}")["id"] for number in range(12)]
+        self.api = self.client(patients_router)
+        # Load the user into the cache so counts below cover the endpoint itself
+        self.db.get_user("admin")
+    
+    def test_detail_is_one_indexed_lookup(self):
+        """Test that a patient detail read is a single primary key lookup"""
+        with self.assertQueries(count=1) as queries:
+            response = self.api.get(f"/{self.patients[0]}")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("USING INTEGER PRIMARY KEY", queries.plans()[0][1][0])
+    
+    def test_sparse_fields_select_only_those_columns(self):
+        """Test the dynamic SELECT built from ?fields="""
+        with self.assertQueries(count=1) as queries:
+            response = self.api.get(f"/{self.patients[0]}?fields=name,last_visit")
+        
+        # Assertions
+        self.assertEqual(response.json(), {"id": self.patients[0], "name": "Patient 0", "last_visit": "2024-01-01"})
+        self.assertTrue(queries.statements[0].startswith("SELECT id, name, last_visit FROM patients WHERE id ="))
+    
+    def test_batch_is_one_query_whatever_the_size(self):
+        """Test that batch reads do not issue a query per id"""
+        for size in (2, 10):
+            ids = ",".join(str(patient_id) for patient_id in self.patients[:size])
+            with self.assertQueries(count=1):
+                response = self.api.get(f"/batch?ids={ids}")
+            self.assertEqual(len(response.json()["patients"]), size)
+    
+    def test_list_scans_once_then_hits_the_cache(self):
+        """Test that the patient list is one scan and is served from cache until a write"""
+        with self.assertQueries(count=1, scans={"patients"}):
+            first = self.api.get("/")
+        with self.assertQueries(count=0):
+            second = self.api.get("/")
+        
+        # Assertions
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(len(first.json()["patients"]), 12)
+    
+    def test_changes_use_the_change_sequence_indexes(self):
+        """Test that delta sync reads ranges of the change_seq indexes"""
+        self.db.update_patient(self.patients[3], {"notes": "changed"})
+        cursor = self.db.list_patient_changes(0, 500)["cursor"]
+        
+        with self.assertQueries(count=2):
+            response = self.api.get(f"/changes?since={cursor - 1}")
+        
+        # Assertions
+        self.assertEqual([patient["id"] for patient in response.json()["patients"]], [self.patients[3]])
+    
+    def test_duplicate_check_reads_only_the_block(self):
+        """Test that intake duplicate checks never scan the patients table"""
+        with self.assertQueries(count=1):
+            response = self.api.post("/duplicates/check", json={"name": "Patient 1", "date_of_birth": "1985-05-10"})
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+    
+    def test_create_stays_within_its_statement_budget(self):
+        """Test the statements behind one registration, counters and keys included"""
+        with self.assertQueries(count=8):
+            response = self.api.post("/new", json={
+                "name": "New Patient",
+                "date_of_birth": "2000-03-15",
+                "gender": "Female",
+                "last_visit": "2024-02-01",
+                "contact": {},
+                "emergency_contact": {},
+                "insurance": "Health Plus",
+            })
+        
+        # Assertions
+        self.assertEqual(response.status_code, 200)
+
+    def test_refused_requests_do_not_touch_patients(self):
+        """Test that the permission check runs before any patient query"""
+        api = self.client(patients_router, username=self.make_user("frontdesk", appointments="Edit"))
+        
+        with self.assertQueries(count=1) as queries:
+            response = api.get(f"/{self.patients[0]}")
+        
+        # Assertions
+        self.assertEqual(response.status_code, 403)
+        self.assertIn("FROM users", queries.statements[0])
+
+class TestDashboardQueries(RealDatabaseTestCase):
+    def test_stats_read_counters_not_patients(self):
+        """Test that dashboard figures come from the counter tables"""
+        for number in range(5):
+            self.make_patient(last_visit=f"202{number}-01-01")
+        client = self.client(dashboard_router)
+        self.db.get_user("admin")
+        self.db.list_modules()
+        
+        with self.assertQueries(count=2):
+            response = client.get("/dashboard")
+        
+        # Assertions
+        self.assertEqual(response.json()["stats"]["patients"]["total"], 5)
+
+class TestHarness(RealDatabaseTestCase):
+    def test_each_test_gets_a_fresh_database(self):
+        """Test that fixtures start from the migrated seed data only"""
+        self.assertEqual(self.db.list_patients_summary(), [])
+        self.assertEqual(sorted(user["username"] for user in self.db.list_users()), ["admin", "doc"])
+    
+    def test_repeated_statements_are_all_counted(self):
+        """Test that an N+1 loop of identical lookups counts every query"""
+        with self.assertQueries(count=5):
+            for _ in range(5):
+                self.db._load_user("admin")
+    
+    def test_trigger_bodies_are_not_counted(self):
+        """Test that a write counts once however many triggers it fires"""
+        patient_id = self.make_patient()["id"]
+        
+        with self.assertQueries() as queries:
+            self.db._connect().execute("UPDATE patients SET notes = 'x' WHERE id = ?", (patient_id,)).connection.commit()
+        
+        # Assertions
+        self.assertEqual(queries.statements, ["UPDATE patients SET notes = 'x' WHERE id = ?"])
+    
+    def test_full_scans_are_reported(self):
+        """Test that an unindexed filter fails the scan check"""
+        with self.assertRaises(AssertionError):
+            with self.assertQueries():
+                self.db.find_duplicate_pairs()
+                self.db._connect().execute("SELECT id FROM patients WHERE insurance = 'Blue Cross'").fetchall()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from datetime import date
+from core.analytics import PatientSnapshot, no_show_report
+from tests.realdb import RealDatabaseTestCase
+
+TODAY = date(2026, 10, 19)
+
+class TestPatientSnapshot(RealDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.child = self.make_patient(date_of_birth="2016-01-01", gender="Female", last_visit="2026-10-01")["id"]
+        self.adult = self.make_patient(date_of_birth="1990-05-10", gender="Male", last_visit="2026-01-15")["id"]
+        self.senior = self.make_patient(date_of_birth="1940-02-29", gender="Female", last_visit="2020-06-01")["id"]
+    
+    def test_report(self):
+        """Test the age, gender and visit recency figures"""
+        snapshot = PatientSnapshot()
+        snapshot.refresh(self.db)
+        
+        report = snapshot.report(TODAY)
+        
+        # Assertions
+        self.assertEqual(report["patients"], 3)
+        self.assertEqual(report["age"], {"0-17": 1, "18-29": 0, "30-44": 1, "45-64": 0, "65-79": 0, "80+": 1})
+        self.assertEqual(report["gender"], {"Female": 2, "Male": 1})
+        self.assertEqual(report["visit_recency"], {"<30d": 1, "30-89d": 0, "90-179d": 0, "180-364d": 1, "1-2y": 0, "2y+": 1})
+    
+    def test_incremental_refresh(self):
+        """Test that updates, inserts and deletes after the cursor are applied"""
+        snapshot = PatientSnapshot()
+        snapshot.refresh(self.db)
+        cursor = snapshot.cursor
+        
+        self.db.update_patient(self.senior, {"last_visit": "2026-10-18"})
+        self.make_patient(date_of_birth="2000-01-01", gender="Other", last_visit="2026-10-18")
+        with self.anchor:
+            self.anchor.execute("DELETE FROM patients WHERE id = ?", (self.child,))
+        snapshot.refresh(self.db)
+        report = snapshot.report(TODAY)
+        
+        # Assertions
+        self.assertGreater(snapshot.cursor, cursor)
+        self.assertEqual(len(snapshot.live), 4)
+        self.assertEqual(report["patients"], 3)
+        self.assertEqual(report["age"]["0-17"], 0)
+        self.assertEqual(report["gender"], {"Female": 1, "Male": 1, "Other": 1})
+        self.assertEqual(report["visit_recency"]["<30d"], 2)
+        self.assertEqual(report["visit_recency"]["2y+"], 0)
+
+class TestNoShowReport(unittest.TestCase):
+    def test_rate_over_known_outcomes(self):
+        """Test that only completed and missed appointments count toward the no-show rate"""
+        appointments = [
+            {"date": "2026-09-01", "status": "Completed"},
+            {"date": "2026-09-02", "status": "Missed"},
+            {"date": "2026-10-01", "status": "Missed"},
+            {"date": "2026-10-02", "status": "Completed"},
+            {"date": "2026-10-03", "status": "Completed"},
+            {"date": "2026-11-01", "status": "Scheduled"},
+        ]
+        
+        report = no_show_report(appointments)
+        
+        # Assertions
+        self.assertEqual(report["appointments"], 5)
+        self.assertEqual(report["missed"], 2)
+        self.assertEqual(report["rate"], 0.4)
+        self.assertEqual(report["by_month"], {
+            "2026-09": {"appointments": 2, "missed": 1, "rate": 0.5},
+            "2026-10": {"appointments": 3, "missed": 1, "rate": 0.3333},
+        })
+    
+    def test_no_outcomes(self):
+        """Test the report when nothing has happened yet"""
+        report = no_show_report([{"date": "2026-11-01", "status": "Scheduled"}])
+        
+        # Assertions
+        self.assertEqual(report, {"appointments": 0, "missed": 0, "rate": None, "by_month": {}})
+
+if __name__ == "__main__":
+    unittest.main()
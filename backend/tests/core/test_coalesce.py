@@ -0,0 +1,90 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import asyncio
+import threading
+import unittest
+from core.coalesce import SingleFlight
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_calls_share_one_load(self):
+        """Test that callers arriving during a load get its result without loading again"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        def load():
+            calls.append(1)
+            release.wait(5)
+            return b"body"
+        
+        first = asyncio.ensure_future(flight.run("patients", "all", load))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(flight.run("patients", "all", load)) for _ in range(4)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(first, *others)
+        
+        # Assertions
+        self.assertEqual(results, [b"body"] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.stats, {"loads": 1, "coalesced": 4, "cached": 0})
+    
+    async def test_no_reuse_after_load_without_ttl(self):
+        """Test that a finished load is not reused when the micro-cache is off"""
+        flight = SingleFlight(ttl=0)
+        
+        await flight.run("patients", "all", lambda: 1)
+        await flight.run("patients", "all", lambda: 2)
+        
+        # Assertions
+        self.assertEqual(flight.stats["loads"], 2)
+    
+    async def test_ttl_reuses_and_invalidate_drops(self):
+        """Test the micro-cache window and invalidation from the write path"""
+        flight = SingleFlight(ttl=60)
+        
+        self.assertEqual(await flight.run("patients", "all", lambda: 1), 1)
+        self.assertEqual(await flight.run("patients", "all", lambda: 2), 1)
+        flight.invalidate("patients")
+        
+        # Assertions
+        self.assertEqual(await flight.run("patients", "all", lambda: 3), 3)
+        self.assertEqual(flight.stats, {"loads": 2, "coalesced": 0, "cached": 1})
+    
+    async def test_invalidate_during_load_starts_new_flight(self):
+        """Test that a write during a load makes later callers load again"""
+        flight = SingleFlight(ttl=60)
+        release = threading.Event()
+        def stale():
+            release.wait(5)
+            return "stale"
+        
+        pending = asyncio.ensure_future(flight.run("patients", "all", stale))
+        await asyncio.sleep(0)
+        flight.invalidate("patients")
+        fresh = await flight.run("patients", "all", lambda: "fresh")
+        release.set()
+        
+        # Assertions
+        self.assertEqual(fresh, "fresh")
+        self.assertEqual(await pending, "stale")
+        self.assertEqual(await flight.run("patients", "all", lambda: "again"), "fresh")
+    
+    async def test_failures_propagate_and_are_not_cached(self):
+        """Test that a failed load raises for every caller and is retried next time"""
+        flight = SingleFlight(ttl=60)
+        def broken():
+            raise RuntimeError("database is locked")
+        
+        with self.assertRaises(RuntimeError):
+            await flight.run("patients", "all", broken)
+        
+        # Assertions
+        self.assertEqual(await flight.run("patients", "all", lambda: "ok"), "ok")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from core.permissions import compile_permissions, permission_bit
+
+class TestPermissionBits(unittest.TestCase):
+    def test_edit_includes_view(self):
+        """Test that an edit grant also passes view checks"""
+        mask = compile_permissions({"patient_mgmt": "Edit", "appointments": "View", "user_mgmt": "None"})
+        
+        # Assertions
+        self.assertTrue(mask & permission_bit("patient_mgmt", "View"))
+        self.assertTrue(mask & permission_bit("patient_mgmt", "Edit"))
+        self.assertTrue(mask & permission_bit("appointments", "View"))
+        self.assertFalse(mask & permission_bit("appointments", "Edit"))
+        self.assertFalse(mask & permission_bit("user_mgmt", "View"))
+    
+    def test_unknown_entries_grant_nothing(self):
+        """Test that stale modules and levels in stored permissions are ignored"""
+        self.assertEqual(compile_permissions({"pharmacy": "Edit", "patient_mgmt": "Owner"}), 0)
+    
+    def test_bits_are_distinct(self):
+        """Test that every module and level maps to its own bit"""
+        bits = [permission_bit(module, level) for module in ("patient_mgmt", "user_mgmt", "appointments") for level in ("View", "Edit")]
+        
+        # Assertions
+        self.assertEqual(len(set(bits)), len(bits))
+        with self.assertRaises(ValueError):
+            permission_bit("patient_mgmt", "None")
+        with self.assertRaises(ValueError):
+            permission_bit("pharmacy", "View")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from datetime import date
+from core.recurrence import occurrences
+
+class TestOccurrences(unittest.TestCase):
+    def test_weekly_window_far_from_start(self):
+        """Test that a window years after the start is expanded directly"""
+        days = list(occurrences(date(2020, 1, 6), "WEEKLY", date(2026, 10, 1), date(2026, 10, 31)))
+        
+        # Assertions
+        self.assertEqual(days, [date(2026, 10, 5), date(2026, 10, 12), date(2026, 10, 19), date(2026, 10, 26)])
+    
+    def test_count_caps_the_whole_series(self):
+        """Test that count limits occurrences from the start, not from the window"""
+        days = list(occurrences(date(2024, 1, 1), "DAILY", date(2024, 1, 3), date(2024, 1, 31), count=5))
+        
+        # Assertions
+        self.assertEqual(days, [date(2024, 1, 3), date(2024, 1, 4), date(2024, 1, 5)])
+    
+    def test_until_and_exdates(self):
+        """Test the end date and skipped occurrences"""
+        days = list(occurrences(
+            date(2024, 1, 1), "DAILY", date(2024, 1, 1), date(2024, 1, 31),
+            interval=3, until=date(2024, 1, 10), exdates={date(2024, 1, 4)},
+        ))
+        
+        # Assertions
+        self.assertEqual(days, [date(2024, 1, 1), date(2024, 1, 7), date(2024, 1, 10)])
+    
+    def test_monthly_skips_short_months(self):
+        """Test that the 31st only occurs in months that have one"""
+        days = list(occurrences(date(2024, 1, 31), "MONTHLY", date(2024, 1, 1), date(2024, 12, 31), count=4))
+        
+        # Assertions
+        self.assertEqual(days, [date(2024, 1, 31), date(2024, 3, 31), date(2024, 5, 31), date(2024, 7, 31)])
+    
+    def test_monthly_interval(self):
+        """Test every other month starting inside the window"""
+        days = list(occurrences(date(2024, 1, 15), "MONTHLY", date(2024, 3, 1), date(2024, 8, 1), interval=2))
+        
+        # Assertions
+        self.assertEqual(days, [date(2024, 3, 15), date(2024, 5, 15), date(2024, 7, 15)])
+    
+    def test_window_before_start(self):
+        """Test that nothing is yielded before the series begins"""
+        self.assertEqual(list(occurrences(date(2024, 6, 1), "WEEKLY", date(2024, 1, 1), date(2024, 5, 31))), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+from tests.mocks import mock_db
+
+
+import unittest
+from core.startup import WarmUp, parse_import_times
+
+class TestWarmUp(unittest.TestCase):
+    def test_ready_after_all_steps(self):
+        """Test that warm-up runs every step in order before reporting ready"""
+        calls = []
+        warm_up = WarmUp([lambda: calls.append("db"), lambda: calls.append("audit")])
+        
+        self.assertEqual(warm_up.status(), {"status": "starting"})
+        warm_up.run()
+        
+        # Assertions
+        self.assertEqual(calls, ["db", "audit"])
+        self.assertTrue(warm_up.ready)
+        self.assertEqual(warm_up.status()["status"], "ready")
+    
+    def test_failed_step(self):
+        """Test that a failing step leaves the app not ready"""
+        def broken():
+            raise OSError("disk full")
+        warm_up = WarmUp([broken])
+        
+        warm_up.run()
+        
+        # Assertions
+        self.assertFalse(warm_up.ready)
+        self.assertEqual(warm_up.status(), {"status": "failed", "error": "OSError: disk full"})
+
+class TestImportProfile(unittest.TestCase):
+    def test_parse_import_times(self):
+        """Test parsing of python -X importtime output"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     json.decoder\n"
+            "import time:       300 |        420 |   json\n"
+            "import time:      1500 |       1920 | routers\n"
+        )
+        
+        rows = parse_import_times(output)
+        
+        # Assertions
+        self.assertEqual(rows, [("json.decoder", 120, 120, 2), ("json", 300, 420, 1), ("routers", 1500, 1920, 0)])
+
+if __name__ == "__main__":
+    unittest.main()
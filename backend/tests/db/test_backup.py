@@ -0,0 +1,77 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import gzip
+import sqlite3
+import tempfile
+import unittest
+from db.backup import BackupError, acquire_backup_lock, backup_database
+from tests.realdb import real_database_module
+
+class TestBackup(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "clinikit.db")
+        self.db = real_database_module().SQLiteDatabase(self.db_path)
+        self.db.create_patient({
+            "name": "Jane Doe",
+            "date_of_birth": "1985-05-10",
+            "gender": "Female",
+            "last_visit": "2024-01-01",
+            "contact": {},
+            "emergency_contact": {},
+            "insurance": "Blue Cross",
+        })
+        self.dest = os.path.join(self.tmpdir.name, "backups", "clinikit.db")
+    
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+    
+    def patient_names(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return [row[0] for row in conn.execute("SELECT name FROM patients")]
+        finally:
+            conn.close()
+    
+    def test_snapshot_matches_source(self):
+        path = backup_database(self.db_path, self.dest, pages=1, sleep=0)
+        
+        self.assertEqual(path, self.dest)
+        self.assertEqual(self.patient_names(path), ["Jane Doe"])
+        self.assertFalse(os.path.exists(self.dest + ".partial"))
+    
+    def test_compressed_snapshot(self):
+        path = backup_database(self.db_path, self.dest, sleep=0, compress=True)
+        
+        self.assertEqual(path, self.dest + ".gz")
+        self.assertFalse(os.path.exists(self.dest))
+        restored = os.path.join(self.tmpdir.name, "restored.db")
+        with gzip.open(path, "rb") as packed, open(restored, "wb") as raw:
+            raw.write(packed.read())
+        self.assertEqual(self.patient_names(restored), ["Jane Doe"])
+        self.assertEqual(sorted(os.listdir(os.path.dirname(path))), ["clinikit.db.gz"])
+    
+    def test_missing_source(self):
+        with self.assertRaises(BackupError):
+            backup_database(os.path.join(self.tmpdir.name, "missing.db"), self.dest)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "missing.db")))
+    
+    def test_one_scheduler_holds_the_lock(self):
+        directory = os.path.join(self.tmpdir.name, "backups")
+        first = acquire_backup_lock(directory)
+        self.assertIsNotNone(first)
+        self.assertIsNone(acquire_backup_lock(directory))
+        
+        first.close()
+        second = acquire_backup_lock(directory)
+        self.assertIsNotNone(second)
+        second.close()
+
+if __name__ == "__main__":
+    unittest.main()
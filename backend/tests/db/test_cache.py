@@ -0,0 +1,87 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import tempfile
+import unittest
+from tests.realdb import real_database_module
+
+class TestCacheCoherence(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(self.tmpdir.name, "clinikit.db")
+        SQLiteDatabase = real_database_module().SQLiteDatabase
+        # Two instances on one file stand in for two uvicorn workers
+        self.worker_a = SQLiteDatabase(db_path, replica=False)
+        self.worker_b = SQLiteDatabase(db_path, replica=False)
+    
+    def tearDown(self):
+        self.worker_a.close()
+        self.worker_b.close()
+        self.tmpdir.cleanup()
+    
+    def test_repeated_reads_are_cached(self):
+        """Test that a second read is served from the cache"""
+        self.worker_a.get_user("doc")
+        self.worker_a.get_user("doc")
+        
+        # Assertions
+        self.assertEqual(self.worker_a._cache.misses, 1)
+        self.assertEqual(self.worker_a._cache.hits, 1)
+    
+    def test_write_in_other_worker_invalidates(self):
+        """Test that a permission change in one worker is seen by the other"""
+        self.assertEqual(self.worker_a.get_user("doc")["permissions"]["patient_mgmt"], "View")
+        
+        self.worker_b.update_user_permissions("doc", {"patient_mgmt": "Edit"})
+        
+        # Assertions
+        self.assertEqual(self.worker_a.get_user("doc")["permissions"], {"patient_mgmt": "Edit"})
+    
+    def test_only_affected_tables_are_invalidated(self):
+        """Test that a patient write keeps cached users and modules"""
+        self.worker_a.get_user("doc")
+        self.worker_a.list_modules()
+        self.assertEqual(self.worker_a.list_patients_summary(), [])
+        
+        self.worker_b.create_patient({
+            "name": "Jane Doe",
+            "date_of_birth": "1985-05-10",
+            "gender": "Female",
+            "last_visit": "2023-02-20",
+            "contact": {},
+            "emergency_contact": {},
+            "insurance": "Blue Cross",
+        })
+        self.worker_a.get_user("doc")
+        self.worker_a.list_modules()
+        patients = self.worker_a.list_patients_summary()
+        
+        # Assertions
+        self.assertEqual([patient["name"] for patient in patients], ["Jane Doe"])
+        self.assertEqual(self.worker_a._cache.hits, 2)
+        self.assertEqual(self.worker_a._cache.misses, 4)
+    
+    def test_equivalent_field_selections_share_an_entry(self):
+        """Test that repeated or reordered fields reuse the cached summary"""
+        self.worker_a.list_patients_summary(["name", "gender"])
+        self.worker_a.list_patients_summary(["gender", "name", "name"])
+        self.worker_a.list_patients_summary(["id", "name", "gender"])
+        
+        # Assertions
+        self.assertEqual(self.worker_a._cache.misses, 1)
+        self.assertEqual(self.worker_a._cache.hits, 2)
+    
+    def test_missing_users_are_not_cached(self):
+        """Test that lookups of unknown usernames do not fill the cache"""
+        self.assertIsNone(self.worker_a.get_user("nobody"))
+        self.assertIsNone(self.worker_a.get_user("nobody"))
+        
+        # Assertions
+        self.assertEqual(self.worker_a._cache.misses, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from tests.realdb import RealDatabaseTestCase
+
+class TestPatientChanges(RealDatabaseTestCase):
+    def test_changes_since_cursor(self):
+        """Test that only writes after the cursor are returned, in order"""
+        first = self.make_patient(name="Ann")
+        second = self.make_patient(name="Bea")
+        cursor = self.db.list_patient_changes(0, 100)["cursor"]
+        
+        self.db.update_patient(first["id"], {"notes": "Updated"})
+        changes = self.db.list_patient_changes(cursor, 100)
+        
+        # Assertions
+        self.assertEqual(cursor, 2)
+        self.assertEqual([patient["id"] for patient in changes["patients"]], [first["id"]])
+        self.assertEqual(changes["patients"][0]["notes"], "Updated")
+        self.assertEqual(changes["cursor"], 3)
+        self.assertEqual(self.db.list_patient_changes(3, 100)["patients"], [])
+        self.assertNotEqual(second["id"], first["id"])
+    
+    def test_deletions_leave_tombstones(self):
+        """Test that a deleted patient is reported by id"""
+        patient = self.make_patient(name="Ann")
+        with self.anchor:
+            self.anchor.execute("DELETE FROM patients WHERE id = ?", (patient["id"],))
+        
+        changes = self.db.list_patient_changes(1, 100)
+        
+        # Assertions
+        self.assertEqual(changes["deleted"], [patient["id"]])
+        self.assertEqual(changes["cursor"], 2)
+    
+    def test_pagination(self):
+        """Test that limit pages through changes with has_more"""
+        for name in ("Ann", "Bea", "Cid"):
+            self.make_patient(name=name)
+        
+        page = self.db.list_patient_changes(0, 2)
+        rest = self.db.list_patient_changes(page["cursor"], 2)
+        
+        # Assertions
+        self.assertEqual([patient["name"] for patient in page["patients"]], ["Ann", "Bea"])
+        self.assertTrue(page["has_more"])
+        self.assertEqual([patient["name"] for patient in rest["patients"]], ["Cid"])
+        self.assertFalse(rest["has_more"])
+    
+    def test_changes_query_uses_index(self):
+        """Test that the cursor lookup is an index range scan"""
+        plan = self.anchor.execute("EXPLAIN QUERY PLAN SELECT id FROM patients WHERE change_seq > ? ORDER BY change_seq", (0,)).fetchall()
+        
+        # Assertions
+        self.assertIn("idx_patients_change_seq", " ".join(row[-1] for row in plan))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from db.duplicates import blocking_keys, name_similarity, soundex
+from tests.realdb import RealDatabaseTestCase
+
+class TestMatching(unittest.TestCase):
+    def test_soundex(self):
+        """Test the phonetic codes used for blocking"""
+        self.assertEqual(soundex("Robert"), "R163")
+        self.assertEqual(soundex("Rupert"), "R163")
+        self.assertEqual(soundex("Ashcraft"), "A261")
+        self.assertEqual(soundex("Smith"), soundex("Smyth"))
+    
+    def test_blocking_keys(self):
+        """Test that every name word gets a key, accents folded and initials skipped"""
+        self.assertEqual(blocking_keys("José A. García", "1990-01-01"), {"J200|1990-01-01", "G620|1990-01-01"})
+    
+    def test_name_similarity(self):
+        """Test that spelling variants and swapped words score high"""
+        self.assertGreater(name_similarity("Jon Smith", "John Smith"), 0.9)
+        self.assertEqual(name_similarity("Smith, John", "John Smith"), 1.0)
+        self.assertLess(name_similarity("John Smith", "Joan Smithers-Black"), 0.8)
+
+class TestDuplicateDetection(RealDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.john = self.make_patient(name="John Smith", date_of_birth="1990-01-01")["id"]
+        self.other = self.make_patient(name="John Smith", date_of_birth="1970-06-30")["id"]
+    
+    def test_candidates_share_date_of_birth(self):
+        """Test that only same-birthday patients with a similar name are returned"""
+        candidates = self.db.find_duplicate_candidates("Jon Smyth", "1990-01-01")
+        
+        # Assertions
+        self.assertEqual([candidate["patient"]["id"] for candidate in candidates], [self.john])
+        self.assertGreaterEqual(candidates[0]["score"], 0.8)
+        self.assertEqual(self.db.find_duplicate_candidates("John Smith", "1990-01-01", exclude_id=self.john), [])
+    
+    def test_update_moves_blocking_keys(self):
+        """Test that keys follow name and date of birth changes"""
+        self.db.update_patient(self.other, {"date_of_birth": "1990-01-01"})
+        
+        candidates = self.db.find_duplicate_candidates("John Smith", "1990-01-01")
+        
+        # Assertions
+        self.assertEqual(sorted(candidate["patient"]["id"] for candidate in candidates), [self.john, self.other])
+        self.assertEqual(self.db.find_duplicate_candidates("John Smith", "1970-06-30"), [])
+    
+    def test_duplicate_pairs(self):
+        """Test the batch scan across the table"""
+        jon = self.make_patient(name="Jon Smith", date_of_birth="1990-01-01")["id"]
+        self.make_patient(name="Mary Jones", date_of_birth="1990-01-01")
+        
+        pairs = self.db.find_duplicate_pairs()
+        
+        # Assertions
+        self.assertEqual([pair["patient_ids"] for pair in pairs], [[self.john, jon]])
+    
+    def test_candidate_lookup_uses_the_key_index(self):
+        """Test that intake checks search the side table, not the patients table"""
+        plan = self.anchor.execute("""
+            EXPLAIN QUERY PLAN SELECT id FROM patients
+            WHERE id IN (SELECT patient_id FROM patient_blocking_keys WHERE key IN (?, ?))
+        """, ("J500|1990-01-01", "S530|1990-01-01")).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        
+        # Assertions
+        self.assertIn("patient_blocking_keys USING PRIMARY KEY", details)
+        self.assertNotIn("SCAN patients", details)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+from db.migrations import MIGRATIONS, Standalone, apply_migrations, get_version, latest_version
+from db.tenancy import ShardRouter
+import manage
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "clinikit.db")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+    
+    def version(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return get_version(conn)
+        finally:
+            conn.close()
+    
+    def test_fresh_database(self):
+        """Test that a new file is brought to the latest version with seed data"""
+        version = apply_migrations(self.db_path)
+        
+        # Assertions
+        self.assertEqual(version, latest_version())
+        self.assertEqual(self.version(), latest_version())
+        self.assertEqual(self.query("SELECT username FROM users ORDER BY username"), [("admin",), ("doc",)])
+        self.assertEqual(len(self.query("SELECT id FROM modules")), 3)
+    
+    def test_upgrade_baseline_database(self):
+        """Test upgrading a database created before migrations existed"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("CREATE TABLE users (username TEXT PRIMARY KEY, password TEXT NOT NULL, permissions TEXT NOT NULL)")
+        conn.execute("""
+            CREATE TABLE patients (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, date_of_birth TEXT NOT NULL,
+                gender TEXT NOT NULL, last_visit TEXT NOT NULL, contact TEXT NOT NULL,
+                emergency_contact TEXT NOT NULL, insurance TEXT NOT NULL, medical_history TEXT, notes TEXT
+            )
+        """)
+        conn.execute("INSERT INTO users VALUES ('admin', 'changed', '{}')")
+        conn.execute("""
+            INSERT INTO patients (name, date_of_birth, gender, last_visit, contact, emergency_contact, insurance)
+            VALUES ('Jane Doe', '1985-05-10', 'Female', '2023-02-20', '{}', '{}', 'Blue Cross')
+        """)
+        conn.commit()
+        conn.close()
+        
+        apply_migrations(self.db_path)
+        
+        # Assertions
+        self.assertEqual(self.version(), latest_version())
+        self.assertEqual(self.query("SELECT password FROM users WHERE username = 'admin'"), [("changed",)])
+        self.assertEqual(self.query("SELECT name FROM patients"), [("Jane Doe",)])
+        self.assertEqual(self.query("SELECT value FROM patient_stats WHERE key = 'total'"), [(1,)])
+        self.assertEqual(self.query("SELECT key FROM patient_blocking_keys ORDER BY key"), [("D000|1985-05-10",), ("J500|1985-05-10",)])
+    
+    def test_running_twice_changes_nothing(self):
+        """Test that already applied migrations are skipped"""
+        apply_migrations(self.db_path)
+        schema = self.query("SELECT sql FROM sqlite_master ORDER BY name")
+        users = self.query("SELECT * FROM users ORDER BY username")
+        
+        version = apply_migrations(self.db_path)
+        
+        # Assertions
+        self.assertEqual(version, latest_version())
+        self.assertEqual(self.query("SELECT sql FROM sqlite_master ORDER BY name"), schema)
+        self.assertEqual(self.query("SELECT * FROM users ORDER BY username"), users)
+    
+    def test_failed_step_rolls_back(self):
+        """Test that a failing migration leaves neither its changes nor a version bump"""
+        migrations = MIGRATIONS[:1] + [
+            (99, "broken", [
+                "CREATE TABLE half_done (id INTEGER PRIMARY KEY)",
+                "INSERT INTO no_such_table VALUES (1)",
+            ]),
+        ]
+        
+        with self.assertRaises(sqlite3.OperationalError):
+            apply_migrations(self.db_path, migrations)
+        
+        # Assertions
+        self.assertEqual(self.version(), 1)
+        self.assertEqual(self.query("SELECT name FROM sqlite_master WHERE name = 'half_done'"), [])
+    
+    def test_standalone_steps_run_before_the_migration(self):
+        """Test that index builds can run outside the migration transaction"""
+        migrations = MIGRATIONS[:1] + [
+            (2, "index", [Standalone("CREATE INDEX IF NOT EXISTS idx_patients_name ON patients (name)")]),
+        ]
+        
+        apply_migrations(self.db_path, migrations)
+        apply_migrations(self.db_path, migrations)
+        
+        # Assertions
+        self.assertEqual(self.version(), 2)
+        self.assertEqual(self.query("SELECT name FROM sqlite_master WHERE name = 'idx_patients_name'"), [("idx_patients_name",)])
+
+class TestMigrateCommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "clinikit.db")
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def run_command(self, *argv):
+        output = StringIO()
+        with redirect_stdout(output):
+            code = manage.main(list(argv))
+        return code, output.getvalue()
+    
+    def test_check_missing_database(self):
+        """Test that --check fails without creating the file"""
+        code, _output = self.run_command("migrate", "--db", self.db_path, "--check")
+        
+        # Assertions
+        self.assertEqual(code, 2)
+        self.assertFalse(os.path.exists(self.db_path))
+    
+    def test_check_then_migrate(self):
+        """Test reporting pending migrations, applying them and checking again"""
+        sqlite3.connect(self.db_path).close()
+        
+        code, output = self.run_command("migrate", "--db", self.db_path, "--check")
+        self.assertEqual(code, 1)
+        self.assertIn("pending 1:", output)
+        
+        code, output = self.run_command("migrate", "--db", self.db_path)
+        self.assertEqual(code, 0)
+        self.assertIn(f"to {latest_version()}", output)
+        
+        code, output = self.run_command("migrate", "--db", self.db_path, "--check")
+        self.assertEqual(code, 0)
+        self.assertNotIn("pending", output)
+    
+    def test_add_clinic(self):
+        """Test that a clinic is provisioned with its seeded logins locked down"""
+        router = ShardRouter(directory=os.path.join(self.tmpdir.name, "clinics"), default_path=self.db_path)
+        with patch("manage.shards", router):
+            code, output = self.run_command("add-clinic", "north", "--password", "s3cret")
+            again, _output = self.run_command("add-clinic", "north", "--password", "s3cret")
+        
+        # Assertions
+        self.assertEqual(code, 0)
+        self.assertEqual(again, 1)
+        self.assertTrue(router.is_provisioned("north"))
+        conn = sqlite3.connect(router.path_for("north"))
+        try:
+            self.assertEqual(set(conn.execute("SELECT DISTINCT password FROM users").fetchall()), {("s3cret",)})
+        finally:
+            conn.close()
+    
+    def test_unknown_clinic_is_not_created(self):
+        """Test that commands refuse a clinic that was never provisioned"""
+        router = ShardRouter(directory=os.path.join(self.tmpdir.name, "clinics"), default_path=self.db_path)
+        with patch("manage.shards", router), self.assertRaises(SystemExit):
+            self.run_command("migrate", "--clinic", "north")
+        
+        # Assertions
+        self.assertFalse(os.path.exists(router.path_for("north")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from unittest.mock import patch
+from tests.realdb import RealDatabaseTestCase
+
+class TestReadReplica(RealDatabaseTestCase):
+    # The replica notices other workers' commits through PRAGMA data_version
+    file_backed = True
+    
+    def setUp(self):
+        super().setUp()
+        # self.db is a second worker writing to the same file, without a replica
+        self.first = self.make_patient(name="Jane Doe")["id"]
+        self.replica = self.open_database(replica=True)
+    
+    def test_reads_match_sqlite(self):
+        """Test that replica reads return what SQLite returns"""
+        self.assertEqual(self.replica.get_user("admin"), self.db.get_user("admin"))
+        self.assertEqual(self.replica.list_modules(), self.db.list_modules())
+        self.assertEqual(self.replica.list_patients_summary(), self.db.list_patients_summary())
+        self.assertEqual(self.replica.list_patients_summary(["name"]), self.db.list_patients_summary(["name"]))
+        self.assertEqual(self.replica.get_patient(self.first), self.db.get_patient(self.first))
+        self.assertEqual(self.replica.get_patient(self.first, ["contact"]), self.db.get_patient(self.first, ["contact"]))
+        self.assertIsNone(self.replica.get_patient(999))
+    
+    def test_reads_do_not_open_connections(self):
+        """Test that replicated reads are served from memory"""
+        with patch.object(self.replica, "_connect", side_effect=AssertionError("read went to SQLite")):
+            self.replica.get_user("doc")
+            self.replica.get_patient(self.first)
+            self.replica.list_patients_summary(["gender"])
+    
+    def test_follows_writes_from_any_worker(self):
+        """Test that creates, updates, deletes and permission changes show up on the next read"""
+        second = self.replica.create_patient(self.patient_record(name="Mary Major"))["id"]
+        self.db.update_patient(self.first, {"last_visit": "2026-10-01"})
+        self.db.update_user_permissions("doc", {"patient_mgmt": "Edit"})
+        with self.anchor:
+            self.anchor.execute("DELETE FROM patients WHERE id = ?", (second,))
+        
+        # Assertions
+        self.assertEqual(self.replica.get_patient(self.first)["last_visit"], "2026-10-01")
+        self.assertIsNone(self.replica.get_patient(second))
+        self.assertEqual([patient["id"] for patient in self.replica.list_patients_summary()], [self.first])
+        self.assertEqual(self.replica.get_user("doc")["permissions"], {"patient_mgmt": "Edit"})
+    
+    def test_list_stays_in_id_order(self):
+        """Test that a new patient changed again after a newer one does not reorder the list"""
+        second = self.make_patient(name="Mary Major")["id"]
+        third = self.make_patient(name="Ann Other")["id"]
+        # The change feed now lists the third patient before the second
+        self.db.update_patient(second, {"notes": "moved"})
+        
+        # Assertions
+        self.assertEqual([patient["id"] for patient in self.replica.list_patients_summary()], [self.first, second, third])
+    
+    def test_budget_falls_back_to_sqlite(self):
+        """Test that patients are read from SQLite once they outgrow the budget"""
+        self.replica._replica.max_bytes = 1
+        self.make_patient(name="Mary Major")
+        
+        patients = self.replica.list_patients_summary()
+        
+        # Assertions
+        self.assertFalse(self.replica._replica.has_patients)
+        self.assertEqual(self.replica._replica.patient_bytes, 0)
+        self.assertEqual(patients, self.db.list_patients_summary())
+        self.assertEqual(self.replica.get_patient(self.first), self.db.get_patient(self.first))
+        self.assertIsNotNone(self.replica.get_user("admin"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import json
+import tempfile
+import unittest
+from core.permissions import compile_permissions
+from db.rows import PatientRow, UserRow, dumps
+from tests.realdb import real_database_module
+
+class TestRows(unittest.TestCase):
+    def test_row_reads_like_a_dict(self):
+        """Test that rows keep the dict access handlers rely on"""
+        user = UserRow.from_db(("doc", "password", '{"patient_mgmt": "View"}'))
+        
+        # Assertions
+        self.assertEqual(user["username"], "doc")
+        self.assertEqual(user.permissions, {"patient_mgmt": "View"})
+        self.assertEqual(user.get("missing", "fallback"), "fallback")
+        self.assertEqual(dict(user), {
+            "username": "doc",
+            "password": "password",
+            "permissions": {"patient_mgmt": "View"},
+            "permission_mask": compile_permissions({"patient_mgmt": "View"}),
+        })
+        with self.assertRaises(KeyError):
+            user["missing"]
+    
+    def test_sparse_rows_only_carry_selected_columns(self):
+        """Test that unselected columns are neither stored nor serialized"""
+        patient = PatientRow.from_db(["id", "contact"], (1, '{"phone": "555-1234"}'))
+        
+        # Assertions
+        self.assertEqual(patient.keys(), ["id", "contact"])
+        self.assertNotIn("notes", patient)
+        self.assertEqual(patient, {"id": 1, "contact": {"phone": "555-1234"}})
+        self.assertFalse(hasattr(patient, "__dict__"))
+    
+    def test_rows_are_read_only(self):
+        """Test that cached rows cannot be changed by a caller"""
+        patient = PatientRow.from_db(["id"], (1,))
+        with self.assertRaises(AttributeError):
+            patient.id = 2
+    
+    def test_dumps_serializes_rows_directly(self):
+        """Test the direct-to-JSON fast path"""
+        rows = [PatientRow.from_db(["id", "name"], (1, "Zoë")), {"id": 2}]
+        
+        body = dumps({"patients": rows})
+        
+        # Assertions
+        self.assertEqual(json.loads(body), {"patients": [{"id": 1, "name": "Zoë"}, {"id": 2}]})
+
+class TestDatabaseRows(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = real_database_module().SQLiteDatabase(os.path.join(self.tmpdir.name, "clinikit.db"))
+    
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+    
+    def test_patient_reads_return_typed_rows(self):
+        """Test full, sparse and summary reads against SQLite"""
+        created = self.db.create_patient({
+            "name": "Jane Doe",
+            "date_of_birth": "1985-05-10",
+            "gender": "Female",
+            "last_visit": "2023-02-20",
+            "contact": {"phone": "555-1234"},
+            "emergency_contact": {"name": "John Doe"},
+            "insurance": "Blue Cross",
+            "notes": "Allergic to penicillin",
+        })
+        
+        full = self.db.get_patient(created["id"])
+        sparse = self.db.get_patient(created["id"], fields=["notes", "contact"])
+        summary = self.db.list_patients_summary()
+        
+        # Assertions
+        self.assertIsInstance(full, PatientRow)
+        self.assertEqual(full["emergency_contact"], {"name": "John Doe"})
+        self.assertEqual(sparse, {"id": created["id"], "contact": {"phone": "555-1234"}, "notes": "Allergic to penicillin"})
+        self.assertEqual(summary[0].keys(), ["id", "name", "date_of_birth", "gender", "last_visit"])
+        with self.assertRaises(ValueError):
+            self.db.get_patient(created["id"], fields=["password"])
+        self.assertEqual(self.db.get_patients([created["id"], 999], fields=["name"]), {created["id"]: {"id": created["id"], "name": "Jane Doe"}})
+    
+    def test_users_and_modules_are_rows(self):
+        """Test user and module reads"""
+        self.assertEqual(self.db.get_user("doc")["permissions"]["patient_mgmt"], "View")
+        self.assertEqual(self.db.list_modules()["patient_mgmt"]["href"], "/patients")
+
+if __name__ == "__main__":
+    unittest.main()
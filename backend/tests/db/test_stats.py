@@ -0,0 +1,59 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import unittest
+from tests.realdb import RealDatabaseTestCase
+
+class TestPatientStats(RealDatabaseTestCase):
+    def visit_counts(self):
+        return dict(self.anchor.execute("SELECT last_visit, count FROM patient_last_visit_counts").fetchall())
+    
+    def test_total_after_create(self):
+        """Test that creating patients bumps the total"""
+        self.assertEqual(self.db.get_patient_stats("2024-01-01"), {"total": 0, "overdue": 0})
+        
+        self.make_patient(last_visit="2023-01-15")
+        self.make_patient(last_visit="2024-06-01")
+        
+        # Assertions
+        self.assertEqual(self.db.get_patient_stats("2024-01-01"), {"total": 2, "overdue": 1})
+    
+    def test_overdue_moves_with_last_visit(self):
+        """Test that changing last_visit moves a patient out of the overdue bucket"""
+        patient = self.make_patient(last_visit="2023-01-15")
+        self.assertEqual(self.db.get_patient_stats("2024-01-01")["overdue"], 1)
+        
+        self.db.update_patient(patient["id"], {"last_visit": "2024-06-01"})
+        
+        # Assertions
+        self.assertEqual(self.db.get_patient_stats("2024-01-01"), {"total": 1, "overdue": 0})
+    
+    def test_empty_count_rows_are_deleted(self):
+        """Test that a visit date with no patients left has no counter row"""
+        patient = self.make_patient(last_visit="2023-01-15")
+        
+        self.db.update_patient(patient["id"], {"last_visit": "2024-06-01"})
+        
+        # Assertions
+        self.assertEqual(self.visit_counts(), {"2024-06-01": 1})
+    
+    def test_rebuild_matches_incremental_counts(self):
+        """Test that a full rebuild agrees with the incrementally maintained counters"""
+        first = self.make_patient(last_visit="2023-01-15")
+        self.make_patient(last_visit="2023-01-15")
+        self.make_patient(last_visit="2024-06-01")
+        self.db.update_patient(first["id"], {"last_visit": "2024-06-01", "notes": "Moved"})
+        incremental = (self.visit_counts(), self.db.get_patient_stats("2024-01-01"))
+        
+        self.db.rebuild_patient_stats()
+        
+        # Assertions
+        self.assertEqual((self.visit_counts(), self.db.get_patient_stats("2024-01-01")), incremental)
+        self.assertEqual(incremental[0], {"2023-01-15": 1, "2024-06-01": 2})
+
+if __name__ == "__main__":
+    unittest.main()
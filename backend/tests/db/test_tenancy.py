@@ -0,0 +1,116 @@
+import sys
+import os
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+
+import tempfile
+import threading
+import unittest
+from db.tenancy import ShardRouter, TenantDatabase, UnknownClinicError, current_clinic
+from tests.realdb import real_database_module
+
+class TestShardRouter(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.router = ShardRouter(
+            directory=os.path.join(self.tmpdir.name, "clinics"),
+            default_path=os.path.join(self.tmpdir.name, "clinikit.db"),
+            max_open=2,
+            factory=real_database_module().SQLiteDatabase,
+        )
+        for clinic in ("north", "south", "east"):
+            self.router.provision(clinic)
+    
+    def tearDown(self):
+        self.router.close_all()
+        self.tmpdir.cleanup()
+    
+    def test_each_clinic_gets_its_own_migrated_file(self):
+        """Test that shards are separate files with their own schema"""
+        north = self.router.get("north")
+        south = self.router.get("south")
+        north.update_user_permissions("doc", {"patient_mgmt": "Edit"})
+        
+        # Assertions
+        self.assertEqual(north.db_path, os.path.join(self.tmpdir.name, "clinics", "north.db"))
+        self.assertEqual(north.get_user("doc")["permissions"], {"patient_mgmt": "Edit"})
+        self.assertEqual(south.get_user("doc")["permissions"]["patient_mgmt"], "View")
+        self.assertEqual(self.router.list_clinics(), ["default", "east", "north", "south"])
+    
+    def test_default_clinic_keeps_original_path(self):
+        """Test that single-clinic installs keep using the existing database"""
+        self.assertEqual(self.router.get("default").db_path, os.path.join(self.tmpdir.name, "clinikit.db"))
+    
+    def test_least_recently_used_shard_is_evicted(self):
+        """Test that only max_open handles are kept"""
+        north = self.router.get("north")
+        self.router.get("south")
+        self.router.get("north")
+        self.router.get("east")
+        
+        # Assertions
+        self.assertEqual(list(self.router._shards), ["north", "east"])
+        self.assertIs(self.router.get("north"), north)
+    
+    def test_opening_a_shard_does_not_block_other_clinics(self):
+        """Test that a slow shard open only holds up callers for that clinic"""
+        factory = self.router.factory
+        started = threading.Event()
+        release = threading.Event()
+        opened = []
+        released = []
+        
+        def slow_factory(path):
+            opened.append(path)
+            if path == self.router.path_for("north"):
+                started.set()
+                released.append(release.wait(5))
+            return factory(path)
+        
+        self.router.factory = slow_factory
+        callers = [threading.Thread(target=self.router.get, args=("north",)) for _ in range(3)]
+        for caller in callers:
+            caller.start()
+        started.wait(5)
+        south = self.router.get("south")
+        release.set()
+        for caller in callers:
+            caller.join()
+        
+        # Assertions
+        self.assertEqual(south.db_path, self.router.path_for("south"))
+        self.assertEqual(opened.count(self.router.path_for("north")), 1)
+        self.assertEqual(released, [True])
+    
+    def test_unprovisioned_clinic_is_not_created(self):
+        """Test that opening an unknown clinic never creates its database"""
+        with self.assertRaises(UnknownClinicError):
+            self.router.get("west")
+        
+        # Assertions
+        self.assertFalse(self.router.is_provisioned("west"))
+        self.assertFalse(os.path.exists(self.router.path_for("west")))
+        self.assertTrue(self.router.is_provisioned("north"))
+        self.assertTrue(self.router.is_provisioned("default"))
+    
+    def test_invalid_clinic_is_rejected(self):
+        """Test that clinic ids cannot escape the shard directory"""
+        with self.assertRaises(ValueError):
+            self.router.get("../secrets")
+    
+    def test_tenant_database_follows_current_clinic(self):
+        """Test that calls are routed by the request's clinic"""
+        tenant_db = TenantDatabase(self.router)
+        token = current_clinic.set("north")
+        try:
+            path = tenant_db.db_path
+        finally:
+            current_clinic.reset(token)
+        
+        # Assertions
+        self.assertEqual(path, os.path.join(self.tmpdir.name, "clinics", "north.db"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+# backend/tests/realdb.py
+import importlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Set, Tuple
+from unittest.mock import patch
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from core.config import COOKIE_NAME
+from db.connection import connect
+
+_real_database = None
+
+def real_database_module():
+    """
+    Import the real db.database even when tests.mocks has replaced it in sys.modules.
+    """
+    global _real_database
+    if _real_database is None:
+        mocked = sys.modules.pop("db.database", None)
+        try:
+            _real_database = importlib.import_module("db.database")
+        finally:
+            if mocked is not None:
+                sys.modules["db.database"] = mocked
+    return _real_database
+
+# Statements worth counting; transaction control and pragmas are not
+COUNTED_STATEMENTS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+class QueryLog:
+    """
+    The statements an SQLiteDatabase executed while it was being captured.
+
+    Every statement execution counts, one per row for executemany, so a
+    statement repeated in a loop counts every time while the triggers it
+    fires count for nothing.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.statements: List[str] = []
+        self._parameters: List = []
+        self._conn = conn
+
+    def record(self, statement: str, parameters=()):
+        if not statement.lstrip().upper().startswith(COUNTED_STATEMENTS):
+            return
+        self.statements.append(" ".join(statement.split()))
+        self._parameters.append(parameters)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def plans(self) -> List[Tuple[str, List[str]]]:
+        """
+        EXPLAIN QUERY PLAN details for every captured SELECT.
+        """
+        return [
+            (statement, [row[-1] for row in self._conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)])
+            for statement, parameters in zip(self.statements, self._parameters)
+            if statement.upper().startswith(("SELECT", "WITH"))
+        ]
+
+    def full_scans(self) -> Set[str]:
+        """
+        Tables read with a full scan (of the table or of a whole index) by any captured SELECT.
+        """
+        return {
+            detail.split()[1]
+            for _statement, details in self.plans()
+            for detail in details
+            if detail.startswith("SCAN ") and not detail.startswith("SCAN CONSTANT ROW")
+        }
+
+class TracedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        if self.connection.queries is not None:
+            self.connection.queries.record(sql, parameters)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # SQLite runs the statement once per row, so each row counts
+        seq_of_parameters = list(seq_of_parameters)
+        if self.connection.queries is not None:
+            for parameters in seq_of_parameters:
+                self.connection.queries.record(sql, parameters)
+        return super().executemany(sql, seq_of_parameters)
+
+class TracedConnection(sqlite3.Connection):
+    """
+    A connection that reports each statement it executes to `queries`.
+    """
+
+    queries = None
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    # The C implementations bypass cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+class RealDatabaseTestCase(unittest.TestCase):
+    """
+    Runs each test against a fresh, fully migrated SQLiteDatabase on a
+    shared-cache in-memory SQLite database, so the real SQL, indexes and
+    triggers are exercised without touching disk. Every test gets its own
+    uniquely named database, so test processes run in parallel safely.
+
+    Connections sharing a cache never see each other's commits in PRAGMA
+    data_version, so tests of several workers on one database set
+    `file_backed` to run on a temporary file instead.
+
+    `assertQueries` records the statements an action runs, so tests can
+    pin query counts (catching N+1 loops) and reject full table scans.
+    """
+
+    file_backed = False
+
+    def setUp(self):
+        super().setUp()
+        if self.file_backed:
+            tmpdir = tempfile.TemporaryDirectory()
+            self.addCleanup(tmpdir.cleanup)
+            self.db_uri = os.path.join(tmpdir.name, "clinikit.db")
+        else:
+            self.db_uri = f"file:clinikit-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        # An in-memory database lives only while a connection to it is open
+        self.anchor = connect(self.db_uri, check_same_thread=False)
+        self.addCleanup(self.anchor.close)
+        self.db = self.open_database()
+        self._queries = None
+
+        def traced_connect():
+            conn = connect(self.db_uri, factory=TracedConnection)
+            conn.queries = self._queries
+            return conn
+
+        self.db._connect = traced_connect
+
+    def open_database(self, replica: bool = False):
+        """
+        Another SQLiteDatabase on this test's database, like a second worker.
+        """
+        database = real_database_module().SQLiteDatabase(self.db_uri, replica=replica)
+        self.addCleanup(database.close)
+        return database
+
+    # Fixture factories
+    def patient_record(self, **overrides) -> Dict:
+        return {
+            "name": "Jane Doe",
+            "date_of_birth": "1985-05-10",
+            "gender": "Female",
+            "last_visit": "2024-01-01",
+            "contact": {"phone": "555-1234"},
+            "emergency_contact": {"name": "John Doe"},
+            "insurance": "Blue Cross",
+            **overrides,
+        }
+
+    def make_patient(self, **overrides) -> Dict:
+        return self.db.create_patient(self.patient_record(**overrides))
+
+    def make_user(self, username: str, password: str = "password", **permissions) -> str:
+        self.anchor.execute(
+            "INSERT INTO users (username, password, permissions) VALUES (?, ?, ?)",
+            (username, password, json.dumps(permissions)),
+        )
+        self.anchor.commit()
+        return username
+
+    def client(self, router: APIRouter, username: str = "admin") -> TestClient:
+        """
+        A client for `router` whose requests, from every clinic, reach this
+        test's database, logged in as `username`.
+        """
+        app = FastAPI()
+        app.include_router(router)
+        # A plain function, as tests.mocks overrides MagicMock.return_value for the whole process
+        shard_patcher = patch("db.tenancy.shards.get", lambda clinic: self.db)
+        shard_patcher.start()
+        self.addCleanup(shard_patcher.stop)
+        client = TestClient(app)
+        client.cookies.set(COOKIE_NAME, username)
+        return client
+
+    @contextmanager
+    def assertQueries(self, count: int = None, scans: Set[str] = frozenset()) -> Iterator[QueryLog]:
+        """
+        Capture the statements run inside the block and check that exactly
+        `count` ran (when given) and that only tables in `scans` were fully scanned.
+        """
+        queries = QueryLog(self.anchor)
+        self._queries = queries
+        try:
+            yield queries
+        finally:
+            self._queries = None
+        if count is not None:
+            self.assertEqual(queries.count, count, "\n".join(queries.statements))
+        unexpected = queries.full_scans() - set(scans)
+        self.assertFalse(unexpected, f"Full scan of {sorted(unexpected)}:\n" + "\n".join(
+            f"{statement}\n    {details}" for statement, details in queries.plans()
+        ))